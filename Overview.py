@@ -1,16 +1,27 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+import functools
+import json
+import logging
+import sqlite3
 import time
 import requests
 import xml.etree.ElementTree as ET
-
-# --- Configuration ---
-ENTSOE_API_KEY = "PASTE_YOUR_ENTSOE_API_KEY_HERE"
-ENTSOE_AREA_CODE = "10YCH-SWISSGRID"
+from intraday_core import blotter, entsoe, feed, instrument, journal, limits, overview, positions, risk, sources, stats, tables, ticks, timegrid
+from intraday_core.styling import style_dataframe
+from config import ENTSOE_API_KEY, ENTSOE_API_KEY_PLACEHOLDER, ENTSOE_AREA_CODE, PRICE_STORE_PATH, DIAGNOSTICS, TICK_SOURCE, MARKET_FEED, LIMITS, JOURNAL_PATH, JOURNAL_RETENTION_DAYS
 
 st.set_page_config(page_title="CH ID Live Dashboard", layout="wide")
+instrument.configure(**DIAGNOSTICS)
+logger = logging.getLogger(__name__)
+
+# Refresh intervals of the live fragments (the producer itself ticks every second)
+SUMMARY_REFRESH_SECONDS = 1
+BLOTTER_REFRESH_SECONDS = 1
+# A failed price fetch is not cached; the producer retries it at most this often
+FETCH_RETRY_SECONDS = 60
+FETCH_ERRORS = (requests.exceptions.RequestException, ET.ParseError, sqlite3.Error)
 
 # Style for blinking text
 st.markdown("""
@@ -32,110 +43,30 @@ st.markdown("""
 }
 </style>
 """, unsafe_allow_html=True)
-atr = round(np.random.uniform(50, 60),2)
 
 @st.cache_data(ttl=3600) # Cache for 1 hour
-def fetch_historical_prices(api_key, area_code, end_date, days_to_fetch):
-    if not api_key or api_key == "PASTE_YOUR_ENTSOE_API_KEY_HERE":
-        return pd.DataFrame()
-    start_date = end_date - timedelta(days=days_to_fetch)
-    params = {
-        'securityToken': api_key, 'documentType': 'A44', 'in_Domain': area_code,
-        'out_Domain': area_code, 'periodStart': start_date.strftime('%Y%m%d%H%M'),
-        'periodEnd': end_date.strftime('%Y%m%d%H%M'),
-    }
-    try:
-        response = requests.get("https://web-api.tp.entsoe.eu/api", params=params)
-        response.raise_for_status()
-        root = ET.fromstring(response.content)
-        namespace = {'ns': 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0'}
-        points = []
-        for ts in root.findall('ns:TimeSeries', namespace):
-            series_start_str = ts.find('.//ns:start', namespace).text
-            series_start = datetime.fromisoformat(series_start_str.replace('Z', '+00:00'))
-            for p in ts.findall('.//ns:Point', namespace):
-                pos = int(p.find('ns:position', namespace).text)
-                price = float(p.find('ns:price.amount', namespace).text)
-                point_time = series_start + timedelta(hours=pos-1)
-                points.append({'time': point_time, 'price': price})
-        if not points: return pd.DataFrame()
-        df = pd.DataFrame(points).set_index('time')
-        df['hour'] = df.index.hour
-        df['day'] = df.index.date
-        price_df = df.pivot(index='day', columns='hour', values='price')
-        return price_df
-    except (requests.exceptions.RequestException, ET.ParseError) as e:
-        st.error(f"API error: {e}. Could not fetch historical prices.")
+def fetch_historical_prices(api_key, area_code, end_day, days_to_fetch):
+    # Errors propagate uncached to compute_overview_tick, which runs off any session
+    if not api_key or api_key == ENTSOE_API_KEY_PLACEHOLDER:
         return pd.DataFrame()
+    return entsoe.load_prices(api_key, area_code, end_day, days_to_fetch, PRICE_STORE_PATH, grid=timegrid.QUARTER_HOURLY)
+
+@st.cache_data(ttl=3600)
+def blotter_history(api_key, area_code, end_day, days_to_fetch):
+    return blotter.product_history(fetch_historical_prices(api_key, area_code, end_day, days_to_fetch))
 
-@st.cache_data(ttl=1)
-def generate_live_hourly_data(fence_active, historical_prices):
-    hours = [f'H{i}{j}' for i in range(1, 25) for j in ['','-Q1','-Q2','-Q3','-Q4']]
-    data = []
-    real_prices = historical_prices.iloc[-1].to_dict() if not historical_prices.empty else {}
-    for h_num in range(1, 25):
-        for quarter in ['', '-Q1', '-Q2', '-Q3', '-Q4']:
-            h = f"H{h_num}{quarter}"
-            h_col_index = h_num - 1
-            hourly_series = historical_prices[h_col_index].dropna() if h_col_index in historical_prices.columns else pd.Series()
-            if len(hourly_series) > 5:
-                hourly_vol = hourly_series.std()
-                hourly_var = hourly_vol * 10 
-            else:
-                hourly_vol = np.random.uniform(4, 7)
-                hourly_var = np.random.uniform(35, 80)
-            
-            hourly_imb_mw = np.random.uniform(-4, 4)
-            da = real_prices.get(h_col_index, 50 + np.random.uniform(-6, 6))
-            id_mid = da + np.random.uniform(-1.2, 1.2)
-            lob_mw = np.random.uniform(8, 95)
-            vwap_pct = np.random.uniform(-1.5, 2.0)
-            bid_imb = 0.5 + np.random.uniform(-0.3, 0.4) if vwap_pct > 0 else 0.5 + np.random.uniform(-0.4, 0.3)
-            offer_imb = 1 - bid_imb
-            
-            if lob_mw < 25: size_pct = 0.30
-            elif 25 <= lob_mw <= 40: size_pct = 0.50
-            elif 45 <= lob_mw <= 60: size_pct = 0.75
-            elif lob_mw > 65: size_pct = 1.00
-            elif 40 < lob_mw < 45: size_pct = 0.50
-            else: size_pct = 0.75
-            
-            size_mw = lob_mw * size_pct
-            direction_sign = "+" if (bid_imb > offer_imb) else "-"
-            formatted_size = f"{direction_sign}{size_mw:.0f}MW@{id_mid:.2f}"
-            
-            ppa_pos, id_pos, da_pos = np.random.randint(-50, 50), np.random.randint(-20, 20), np.random.randint(-100, 100)
-            hour_residual = ppa_pos + id_pos + da_pos
-            lob_color = ""
-            shape_color = "🟢" if abs(vwap_pct) > 1.0 else ""
-            action, size = "", ""
-            
-            if fence_active:
-                residual_direction_sign = "-" if (hour_residual > 0) else "+"
-                action, size = "Collar", f"{residual_direction_sign}€{id_mid - 2:.0f}P/€{id_mid + 2:.0f}C"
-            else:
-                if abs(lob_mw) > 60: action, size = "Market", formatted_size
-                elif 25 <= abs(lob_mw) <= 40 and max(bid_imb, offer_imb) > 0.7: action, size = "Iceberg", formatted_size
-                elif abs(lob_mw) < 25: action, size = "Ladder", formatted_size
-                elif 25 <= abs(lob_mw) <= 60: action, size = "Leer", formatted_size
-
-            data.append({
-                'Hour': h, 'DA€': f"{da:.2f}", 'ID Bid€': f"{id_mid - 0.1:.2f}/{int(lob_mw * bid_imb):.0f}MW",
-                'ID Offer€': f"{id_mid + 0.1:.2f}/{int(lob_mw * offer_imb):.0f}MW", 'Mid€': f"{id_mid:.2f}",
-                'LOB MW': f"{int(lob_mw)} {lob_color}", 'Shape': f"{vwap_pct:+.2f}{shape_color}",
-                'Hour Residual': f"{hour_residual} MW", 'Hourly VaR': f"€{hourly_var:.1f}k", 
-                'Hourly Vol': f"€{hourly_vol:.2f}", 'Hourly Imb': f"{hourly_imb_mw:+.1f}MW",
-                'Strategy': f"{action}", 'Size': size
-            })
-    df = pd.DataFrame(data)
-    column_rename_map = {'Hourly VaR': 'Var', 'Hourly Imb': 'Imb', 'Hourly Vol': 'Vol', 'LOB MW': 'LOB', 'Hour Residual': 'Residual'}
-    df = df.rename(columns=column_rename_map)
-    desired_order = ['Hour', 'DA€', 'ID Bid€', 'ID Offer€', 'Mid€', 'Shape', 'Var', 'Imb', 'Vol', 'LOB', 'Residual', 'Size', 'Strategy']
-    df = df[desired_order]
-    return df
-
-
-def get_ptf_summary(var, imb, vol, ptf_var=False, imb_breach=False, vol_breach=False):
+@st.cache_resource(ttl=3600)
+def price_stats(api_key, area_code, end_day, days_to_fetch):
+    # Per-product count/mean/std/percentiles/EWMA vol/last price, rebuilt only with a new price history
+    return stats.PriceStats(blotter_history(api_key, area_code, end_day, days_to_fetch))
+
+@st.cache_resource(ttl=3600)
+def price_risk_model(api_key, area_code, end_day, days_to_fetch):
+    # Covariance and scenario quantiles are rebuilt only when a new price history is loaded
+    prices = blotter_history(api_key, area_code, end_day, days_to_fetch)
+    return None if prices.empty else risk.RiskModel(prices)
+
+def get_ptf_summary(pnl, pos, var, imb, vol, ptf_var=False, imb_breach=False, vol_breach=False):
     pnl_str, pos_str = f"**P&L: €{pnl}k** / €850k", f"Net Pos: {pos:+d}MW"
     var_str, vol_str, imb_str = f'**VaR:** €{var:.1f}k', f'**Vol:** €{vol:.2f}', f'**Imb:** {imb:+.1f}MW'
     if ptf_var: var_str = f'<span class="blink-yellow">{var_str}</span>'
@@ -143,78 +74,128 @@ def get_ptf_summary(var, imb, vol, ptf_var=False, imb_breach=False, vol_breach=F
     if vol_breach: vol_str = f'<span class="blink-yellow">{vol_str}</span>'
     return pnl_str, pos_str, var_str, imb_str, vol_str
 
-def get_ptf_vol():
-    return np.random.uniform(3, 7)
-
-def style_dataframe(styler):
-    styler.apply(lambda row: ['background-color: #0B4F6C; color: white' if '**' in str(val) else '' for val in row], subset=['Strategy'], axis=1)
-    def blink_styler(row):
-        styles = [''] * len(row)
-        action = row['Strategy'].replace('**', '')
-        if not action: return styles
-        
-        indices = {col: row.index.get_loc(col) for col in ['Var', 'Vol', 'Imb', 'LOB', 'Shape'] if col in row.index}
-        blink_red, blink_yellow = 'color: red; font-weight: bold; animation: blinker 1s linear infinite;', 'color: yellow; font-weight: bold; animation: blinker 1s linear infinite;'
-        blink_green = 'color: green; font-weight: bold; animation: blinker 1s linear infinite;'
-        
-        market_hour_rules = ["Shape Arb", "Iceberg", "Ladder", "Leer", "Market"]
-        
-        if action == "Shape Arb":
-             styles[indices['Shape']] = blink_green
-        elif action == "Iceberg":
-            if 'Imb' in indices: styles[indices['Imb']] = blink_yellow
-            if 'LOB' in indices: styles[indices['LOB']] = blink_yellow
-        elif action == "Ladder":
-            if 'LOB' in indices: styles[indices['LOB']] = blink_green
-        elif action == "Market":
-            if 'LOB' in indices: styles[indices['LOB']] = blink_red
-        return styles
-    styler.apply(blink_styler, axis=1)
-    return styler
+@st.cache_resource
+def market_feed():
+    # One order-book consumer per process on its own event loop; the producer only reads its latest snapshot
+    return feed.open_feed(len(blotter.BLOTTER_COLUMNS), **MARKET_FEED)
+
+@st.cache_resource(max_entries=1)
+def position_book(trading_day):
+    # One book per process and trading day, filled only by the overview producer
+    return positions.PositionBook(len(blotter.BLOTTER_COLUMNS), blotter.PRODUCT_HOURS)
+
+@st.cache_resource
+def limit_engine():
+    # Breach state carries across ticks, so the engine lives as long as the producer
+    return limits.LimitEngine.from_config(LIMITS, blotter.BLOTTER_LABELS)
+
+@st.cache_resource
+def alert_journal():
+    return journal.Journal(JOURNAL_PATH, retention_days=JOURNAL_RETENTION_DAYS)
+
+def price_models(price_args, previous):
+    # (stats, risk model, fetch error, failed at); a failure is carried on every tick until its retry is due
+    if previous and previous['fetch_error'] and time.time() - previous['fetch_failed_at'] < FETCH_RETRY_SECONDS:
+        return stats.PriceStats(pd.DataFrame()), None, previous['fetch_error'], previous['fetch_failed_at']
+    try:
+        return price_stats(*price_args), price_risk_model(*price_args), None, None
+    except FETCH_ERRORS as e:
+        logger.warning("Could not fetch historical prices: %s", e)
+        return stats.PriceStats(pd.DataFrame()), None, f"API error: {e}. Could not fetch historical prices.", time.time()
+
+def compute_overview_tick(previous):
+    # Computed once per process by the shared producer, never per session; the engine itself is in intraday_core
+    price_args = (ENTSOE_API_KEY, ENTSOE_AREA_CODE, datetime.now().date(), 30)
+    with instrument.stage('overview.fetch'):
+        history_stats, model, fetch_error, failed_at = price_models(price_args, previous)
+    order_book = market_feed().latest().data if market_feed() else None
+    draw = functools.partial(overview.draw_tick, book=order_book)
+    inputs = sources.open_source(**TICK_SOURCE).next('overview', draw)
+    tick = overview.compute_tick(history_stats, model, inputs, position_book=position_book(datetime.now().date()), limit_engine=limit_engine())
+    # Only breach/clear transitions reach the Logs page, once each
+    for event in tick['events']:
+        alert_journal().append(limits.journal_entry(event), ts=event.time)
+    if tick['events']:
+        alert_journal().flush()
+    tick['fetch_error'], tick['fetch_failed_at'] = fetch_error, failed_at
+    return tick
+
+@st.cache_resource
+def table_render(name):
+    # Styled once per tick for every session
+    return tables.TableRender(name)
+
+@st.cache_resource
+def overview_producer():
+    interval = sources.open_source(**TICK_SOURCE).interval('overview', 1.0)
+    return ticks.TickProducer(compute_overview_tick, interval=interval, name='overview-ticks')
 
 # === MAIN DASHBOARD ===
+# Static layout renders once per session; only the fragments below re-run on their own timers
 st.markdown("# 🏦 **Live PNL Trading Dashboard - CH ID**")
-st.markdown(f"**🕐 Live Update:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S CET')}")
-
-today = datetime.now()
-historical_prices = fetch_historical_prices(ENTSOE_API_KEY, ENTSOE_AREA_CODE, today, days_to_fetch=30)
-if historical_prices.empty and ENTSOE_API_KEY != "PASTE_YOUR_ENTSOE_API_KEY_HERE":
-    st.error("Failed to fetch historical prices. The dashboard may not function correctly.")
-
-pnl, pos, imb, ptf_var = np.random.randint(50, 120), np.random.randint(-10, 10), np.random.randint(-7, 7), np.random.uniform(35, 105)
-ptf_vol = get_ptf_vol()
-var_breach, imb_breach, vol_breach = ptf_var > 100, abs(imb) > 5, ptf_vol > 8
-fence_active = var_breach or imb_breach or vol_breach
-pnl_str, pos_str, var_str, vol_str, imb_str = get_ptf_summary(ptf_var, imb, ptf_vol, var_breach, imb_breach, vol_breach)
-
-st.markdown("## 📈 **PTF Summary**")
-cols = st.columns(7)
-shape = np.random.randint(-10, 20)
-momentum = np.random.randint(-10, 20)
-leer = np.random.randint(10, 20)
-ladder = np.random.randint(10, 20)
-iceberg = np.random.randint(10, 20)
-for col, metric in zip(cols, [pnl_str, f"MARKET €{pnl - shape - leer - ladder - iceberg - momentum}k", f"LEER €{leer}k", f"LADDER €{ladder}k", f"ICEBERG €{iceberg}k"]):
-    col.markdown(metric, unsafe_allow_html=True)
-
-cols = st.columns(7)
-for col, metric in zip(cols, [var_str, vol_str, imb_str]):
-    col.markdown(metric, unsafe_allow_html=True)
-
-
-cols = st.columns(7)
-bess = np.random.randint(-10, 10)
-wind = np.random.randint(-10, 10)
-solar = np.random.randint(-10, 10)
-
-for col, metric in zip(cols, [pos_str, f"BESS {bess}MW", f"WIND €{wind}MW", f"SOLAR {solar}MW", f"HYDRO {pos - bess - wind - solar}MW"]):
-    col.markdown(metric, unsafe_allow_html=True)
-
-
-df = generate_live_hourly_data(fence_active, historical_prices)
-st.dataframe(df.style.pipe(style_dataframe), use_container_width=True, hide_index=True, height=870)
-
-st.caption(f'ATR: {atr}',)
 
-time.sleep(1)
-st.rerun()
\ No newline at end of file
+@st.fragment(run_every=SUMMARY_REFRESH_SECONDS)
+def live_summary():
+    with instrument.stage('overview.render_summary'):
+        render_summary()
+
+def render_summary():
+    tick = overview_producer().latest()
+    t = tick.data
+    st.markdown(f"**🕐 Live Update:** {datetime.fromtimestamp(tick.timestamp).strftime('%Y-%m-%d %H:%M:%S CET')}")
+
+    if t['fetch_error']:
+        st.error(f"{t['fetch_error']} The dashboard may not function correctly.")
+    elif not t['prices_loaded'] and ENTSOE_API_KEY != ENTSOE_API_KEY_PLACEHOLDER:
+        st.error("Failed to fetch historical prices. The dashboard may not function correctly.")
+
+    pnl, pos = t['pnl'], t['pos']
+    pnl_str, pos_str, var_str, vol_str, imb_str = get_ptf_summary(pnl, pos, t['ptf_var'], t['imb'], t['ptf_vol'], t['var_breach'], t['imb_breach'], t['vol_breach'])
+
+    st.markdown("## 📈 **PTF Summary**")
+    cols = st.columns(7)
+    for col, metric in zip(cols, [pnl_str, f"MARKET €{t['market']}k", f"LEER €{t['leer']}k", f"LADDER €{t['ladder']}k", f"ICEBERG €{t['iceberg']}k"]):
+        col.markdown(metric, unsafe_allow_html=True)
+
+    cols = st.columns(7)
+    for col, metric in zip(cols, [var_str, vol_str, imb_str]):
+        col.markdown(metric, unsafe_allow_html=True)
+
+    cols = st.columns(7)
+    for col, metric in zip(cols, [pos_str, f"BESS {t['bess']}MW", f"WIND €{t['wind']}MW", f"SOLAR {t['solar']}MW", f"HYDRO {t['hydro']}MW"]):
+        col.markdown(metric, unsafe_allow_html=True)
+
+@st.fragment(run_every=BLOTTER_REFRESH_SECONDS)
+def live_blotter():
+    tick = overview_producer().latest()
+    t = tick.data
+    with instrument.stage('overview.render_blotter'):
+        styled = table_render('overview.blotter').render(tick.version, t['blotter'], lambda frame: frame.style.pipe(style_dataframe))
+        st.dataframe(styled, use_container_width=True, hide_index=True, height=870)
+    st.caption(f"ATR: {t['atr']}",)
+
+@st.fragment(run_every=5)
+def diagnostics_panel():
+    # Process-wide: producer ticks and the render stages of every page and session
+    snapshot = instrument.RECORDER.snapshot()
+    if not snapshot['stages']:
+        st.caption("No samples yet")
+        return
+    stages = pd.DataFrame(snapshot['stages']).T.sort_index()
+    stages[['mean', 'max', 'p50', 'p95', 'p99']] *= 1000
+    st.dataframe(stages.rename(columns={c: f'{c} ms' for c in ['mean', 'max', 'p50', 'p95', 'p99']}).drop(columns='sum'), use_container_width=True)
+    if snapshot['counters']:
+        st.write(snapshot['counters'])
+    if instrument.RECORDER.profiles:
+        name = st.selectbox("cProfile sample", sorted(instrument.RECORDER.profiles))
+        st.code(instrument.RECORDER.profiles[name])
+    col1, col2 = st.columns(2)
+    col1.download_button("JSON", json.dumps(snapshot, indent=2), file_name="diagnostics.json")
+    col2.download_button("Prometheus", instrument.RECORDER.prometheus(snapshot), file_name="diagnostics.prom")
+    st.caption(f"Also written to {DIAGNOSTICS['export_path']}.json/.prom every {DIAGNOSTICS['export_seconds']:.0f}s")
+
+live_summary()
+live_blotter()
+
+with st.expander("🩺 Diagnostics", expanded=False):
+    diagnostics_panel()
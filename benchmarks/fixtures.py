@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from intraday_core import timegrid
+
+A44_NS = 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0'
+
+def a44_document(days, resolution='PT15M', seed=0, start=datetime(2025, 10, 1)):
+    """A44 publication document in the ENTSO-E layout (one TimeSeries per delivery day), same bytes for the same seed"""
+    rng = np.random.default_rng(seed)
+    step = timegrid.get(resolution).minutes
+    end = start + timedelta(days=days)
+    out = [f'<?xml version="1.0" encoding="UTF-8"?>\n<Publication_MarketDocument xmlns="{A44_NS}">',
+           f'<mRID>bench</mRID><period.timeInterval><start>{start:%Y-%m-%dT%H:%MZ}</start><end>{end:%Y-%m-%dT%H:%MZ}</end></period.timeInterval>']
+    for day in range(days):
+        first = start + timedelta(days=day)
+        prices = 60 + 25 * np.sin(np.arange(1440 // step) * step / 1440 * 2 * np.pi) + rng.normal(0, 8, 1440 // step)
+        out.append(f'<TimeSeries><mRID>{day + 1}</mRID><businessType>A62</businessType><curveType>A03</curveType>'
+                   f'<Period><timeInterval><start>{first:%Y-%m-%dT%H:%MZ}</start><end>{first + timedelta(days=1):%Y-%m-%dT%H:%MZ}</end></timeInterval>'
+                   f'<resolution>{resolution}</resolution>')
+        out += [f'<Point><position>{i + 1}</position><price.amount>{p:.2f}</price.amount></Point>' for i, p in enumerate(prices)]
+        out.append('</Period></TimeSeries>')
+    out.append('</Publication_MarketDocument>')
+    return '\n'.join(out).encode()
+
+def price_history(days=31, grid=timegrid.QUARTER_HOURLY, seed=0):
+    """Day × period random-walk prices, the shape load_prices returns"""
+    rng = np.random.default_rng(seed)
+    days_index = pd.Index([datetime(2025, 10, 1).date() + timedelta(days=i) for i in range(days)], name='day')
+    return pd.DataFrame(50 + rng.normal(0, 8, (days, len(grid))).cumsum(axis=0), index=days_index, columns=grid.index)
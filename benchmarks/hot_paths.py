@@ -0,0 +1,185 @@
+"""Dashboard hot paths at 1×, 10× and 100× today's sizes.
+
+Suites follow the asv layout (params, setup, time_* and peakmem_* methods) and run with benchmarks/run.py.
+"""
+import shutil
+import tempfile
+import numpy as np
+from intraday_core import backtest, blotter, curves, entsoe, feed, journal, overview, positions, risk, stats, styling, timegrid
+from fixtures import a44_document, price_history
+
+SCALES = [1, 10, 100]
+SEED = 42
+# Today's sizes: 120 blotter rows, one month of quarter-hour prices, 24 + 96 curve periods, 1000 journal entries,
+# one second of order-book messages at 2000/s, a one-year backtest over 10 parameter combinations, 5000 fills a day
+JOURNAL_ENTRIES = 1000
+FEED_MESSAGES = 2000
+BACKTEST_COMBOS = 10
+DAY_FILLS = 5000
+HISTORY_DAYS = 31
+
+class Blotter:
+    params = SCALES
+
+    def setup(self, scale):
+        # Rows scale, the 120 products (and so the risk model) stay as today
+        self.history = blotter.product_history(price_history(HISTORY_DAYS, seed=SEED))
+        self.stats = stats.PriceStats(self.history)
+        self.model = risk.RiskModel(self.history)
+        self.labels = np.tile(blotter.BLOTTER_LABELS, scale)
+        self.col_idx = np.tile(blotter.BLOTTER_COLUMNS, scale)
+        self.frame = self.generate(scale)
+
+    def generate(self, scale):
+        rng = np.random.RandomState(SEED)
+        inputs = blotter.draw_tick_inputs(len(self.labels), rng)
+        overview.portfolio_risk(self.model, inputs, self.stats.position(self.col_idx), blotter.PRODUCT_HOURS[self.col_idx])
+        return blotter.build_blotter(inputs, self.labels, self.col_idx, False, self.stats, self.model)
+
+    def time_generate(self, scale):
+        self.generate(scale)
+
+    def peakmem_generate(self, scale):
+        self.generate(scale)
+
+    def style(self, scale):
+        # Every tick brings a new strategy vector, so the CSS cache starts cold
+        styling._blotter_css.cache_clear()
+        return self.frame.style.pipe(styling.style_dataframe).to_html()
+
+    def time_style(self, scale):
+        self.style(scale)
+
+    def peakmem_style(self, scale):
+        self.style(scale)
+
+class ParseA44:
+    params = SCALES
+
+    def setup(self, scale):
+        self.content = a44_document(HISTORY_DAYS * scale, seed=SEED)
+
+    def time_parse(self, scale):
+        entsoe.parse_a44(self.content)
+
+    def peakmem_parse(self, scale):
+        entsoe.parse_a44(self.content)
+
+class CurveRoll:
+    params = SCALES
+
+    def setup(self, scale):
+        shape = np.linspace(25, 80, len(timegrid.HOURLY) * scale)
+        shapes = {'60m': shape, '15m': timegrid.HOURLY.to(timegrid.QUARTER_HOURLY, shape)}
+        self.windows = curves.CurveWindows(shapes, ['DA €/MWh', 'ID €/MWh', 'Spread €', 'Spread %'], rng=np.random.RandomState(SEED))
+
+    def roll(self, scale):
+        # One producer tick plus the frame a session renders from the views
+        views = self.windows.tick()
+        return {name: buffer.frame() for name, buffer in self.windows.buffers.items()}, views
+
+    def time_roll(self, scale):
+        self.roll(scale)
+
+    def peakmem_roll(self, scale):
+        self.roll(scale)
+
+class JournalLog:
+    params = SCALES
+
+    def setup(self, scale):
+        self.dir = tempfile.mkdtemp(prefix='bench-journal-')
+        rng = np.random.RandomState(SEED)
+        self.entries = [journal.demo_entry(rng) for _ in range(JOURNAL_ENTRIES * scale)]
+        self.filled = journal.Journal(f'{self.dir}/filled.sqlite', batch_size=len(self.entries))
+        for entry in self.entries: self.filled.append(entry)
+        self.filled.flush()
+        self.runs = 0
+
+    def teardown(self, scale):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def append(self, scale):
+        self.runs += 1
+        log = journal.Journal(f'{self.dir}/append-{self.runs}.sqlite')
+        for entry in self.entries: log.append(entry)
+        log.flush()
+
+    def time_append(self, scale):
+        self.append(scale)
+
+    def peakmem_append(self, scale):
+        self.append(scale)
+
+    def filter(self, scale):
+        # What one Logs page render reads: totals, KPIs, dropdowns and one filtered page
+        totals = self.filled.totals(day=None)
+        journal.summarize(totals)
+        hours = journal.active_values(totals, 'hour')
+        count = journal.summarize(totals, hour=hours[0])['count']
+        return count, self.filled.read_page(0, 100, hour=hours[0])
+
+    def time_filter(self, scale):
+        self.filter(scale)
+
+    def peakmem_filter(self, scale):
+        self.filter(scale)
+
+class FeedIngest:
+    params = SCALES
+
+    def setup(self, scale):
+        # Messages as the simulated exchange sends them, decoded once; the network is not part of the timing
+        exchange = feed.SimulatedExchange(len(blotter.BLOTTER_COLUMNS), seed=SEED)
+        rng = np.random.RandomState(SEED)
+        mids = exchange.mid.copy()
+        self.messages = exchange._snapshot_messages(mids, rng) + exchange._batch(mids, rng, FEED_MESSAGES * scale)
+
+    def ingest(self, scale):
+        # One second of messages into a fresh book, then the snapshot the Overview producer reads
+        book = feed.OrderBook(len(blotter.BLOTTER_COLUMNS))
+        for message in self.messages: book.apply(message)
+        return feed.book_inputs(blotter.draw_tick_inputs(len(blotter.BLOTTER_LABELS), np.random.RandomState(SEED)), book.snapshot(), blotter.BLOTTER_COLUMNS)
+
+    def time_ingest(self, scale):
+        self.ingest(scale)
+
+    def peakmem_ingest(self, scale):
+        self.ingest(scale)
+
+class Backtest:
+    params = SCALES
+
+    def setup(self, scale):
+        # A year of hourly prices plus the risk window; the combinations scale, inline so pool start-up is not timed
+        self.prices = price_history(365 + backtest.WINDOW_DAYS + 1, grid=timegrid.HOURLY, seed=SEED)
+        self.combos = backtest.param_grid(var_limit=np.linspace(50, 200, BACKTEST_COMBOS * scale))
+
+    def time_sweep(self, scale):
+        backtest.run(self.prices, self.combos, workers=1)
+
+    def peakmem_sweep(self, scale):
+        backtest.run(self.prices, self.combos, workers=1)
+
+class PositionFills:
+    params = SCALES
+
+    def setup(self, scale):
+        rng = np.random.RandomState(SEED)
+        n, periods = DAY_FILLS * scale, len(blotter.BLOTTER_COLUMNS)
+        self.fills = (rng.randint(0, len(positions.ASSETS), n), rng.randint(0, len(positions.BOOKS), n),
+                      rng.randint(0, periods, n), rng.uniform(-50, 50, n), rng.uniform(20, 80, n))
+        self.mid = rng.uniform(20, 80, periods)
+
+    def book(self, scale):
+        # A day of fills in one batch, then what the PTF summary reads after a new mid
+        book = positions.PositionBook(len(blotter.BLOTTER_COLUMNS), blotter.PRODUCT_HOURS)
+        book.fill(*self.fills)
+        book.mark_to_market(self.mid)
+        return book.pnl(), book.pnl_by_book(), book.position_by_asset(), book.residuals(blotter.BLOTTER_COLUMNS)
+
+    def time_book(self, scale):
+        self.book(scale)
+
+    def peakmem_book(self, scale):
+        self.book(scale)
@@ -0,0 +1,114 @@
+"""Run the hot-path benchmarks and record wall time and peak memory.
+
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --scales 1 10 --only Blotter ParseA44 --compare bench.json
+
+Wall time is the median (and min) per call over --repeat rounds of timeit.autorange. Peak memory is the
+tracemalloc peak of one call (NumPy buffers included). --compare exits non-zero when a result is more than
+--threshold slower or larger than the baseline.
+"""
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), HERE]
+
+import numpy as np
+import pandas as pd
+import hot_paths
+
+def _wall(fn, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = np.array(timer.repeat(repeat, number)) / number
+    return float(np.median(per_call)), float(per_call.min())
+
+def _peak(fn):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_suite(cls, scales, repeat):
+    results = []
+    names = sorted({name.split('_', 1)[1] for name, _ in inspect.getmembers(cls, inspect.isfunction) if name.startswith(('time_', 'peakmem_'))})
+    for scale in scales:
+        suite = cls()
+        suite.setup(scale)
+        try:
+            for name in names:
+                result = {'benchmark': f'{cls.__name__}.{name}', 'scale': scale}
+                if hasattr(suite, f'time_{name}'):
+                    median, best = _wall(lambda: getattr(suite, f'time_{name}')(scale), repeat)
+                    result.update(wall_ms=round(median * 1e3, 3), wall_ms_min=round(best * 1e3, 3))
+                if hasattr(suite, f'peakmem_{name}'):
+                    result['peak_mib'] = round(_peak(lambda: getattr(suite, f'peakmem_{name}')(scale)) / 2**20, 3)
+                print(f"{result['benchmark']:<22} {scale:>4}×  {result.get('wall_ms', float('nan')):>10.3f} ms  {result.get('peak_mib', float('nan')):>9.2f} MiB", flush=True)
+                results.append(result)
+        finally:
+            if hasattr(suite, 'teardown'): suite.teardown(scale)
+    return results
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit, 'timestamp': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+        'numpy': np.__version__, 'pandas': pd.__version__, 'machine': platform.platform(),
+    }
+
+def compare(results, baseline, threshold):
+    """Ratios against a previous run; returns the results that regressed"""
+    previous = {(r['benchmark'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        old = previous.get((result['benchmark'], result['scale']))
+        if old is None: continue
+        for key in ('wall_ms', 'peak_mib'):
+            if key in result and old.get(key):
+                ratio = result[key] / old[key]
+                if ratio > 1 + threshold:
+                    regressions.append((result['benchmark'], result['scale'], key, old[key], result[key], ratio))
+    for name, scale, key, old, new, ratio in regressions:
+        print(f"REGRESSION {name} {scale}× {key}: {old} -> {new} ({ratio:.2f}×)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=hot_paths.SCALES)
+    parser.add_argument('--only', nargs='+', help='suite names, e.g. Blotter JournalLog')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', help='JSON from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown/growth before flagging (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    suites = [cls for name, cls in inspect.getmembers(hot_paths, inspect.isclass)
+              if cls.__module__ == hot_paths.__name__ and (not args.only or name in args.only)]
+    print(f"{'benchmark':<22} {'scale':>5}  {'wall (median)':>13}  {'peak':>9}")
+    results = [result for cls in suites for result in run_suite(cls, args.scales, args.repeat)]
+    report = {'environment': _environment(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(results, json.load(f), args.threshold) else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
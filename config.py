@@ -0,0 +1,48 @@
+import os
+
+# --- Configuration ---
+ENTSOE_API_KEY_PLACEHOLDER = "PASTE_YOUR_ENTSOE_API_KEY_HERE"
+ENTSOE_API_KEY = ENTSOE_API_KEY_PLACEHOLDER
+ENTSOE_AREA_CODE = "10YCH-SWISSGRID"
+# Local day-ahead price store shared by every worker; only missing or non-final days hit the API
+PRICE_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "entsoe_prices.sqlite")
+# Append-only execution journal (SQLite, WAL) shared by all sessions
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "execution_journal.sqlite")
+JOURNAL_RETENTION_DAYS = 30
+# Stage timings (intraday_core.instrument): JSON + Prometheus text rewritten every few seconds;
+# cProfile / tracemalloc sample every Nth producer tick when set (0 = off)
+DIAGNOSTICS = {
+    'export_path': os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "diagnostics"),
+    'export_seconds': 10.0,
+    'profile_every': 0,
+    'tracemalloc_every': 0,
+}
+# Where tick inputs come from (intraday_core.sources): 'random' (seed for a reproducible run), 'record' to also
+# write every tick to path, or 'replay' to stream a recording from path at speed× its recorded pace
+TICK_SOURCE = {
+    'mode': 'random',
+    'seed': None,
+    'path': os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ticks.bin"),
+    'speed': 1.0,
+}
+# Live order book (intraday_core.feed) behind the blotter's bid/offer, LOB depth and imbalance; off by default.
+# simulate=True starts a local stand-in exchange on host:port (0 = any free port) instead of connecting out
+MARKET_FEED = {
+    'enabled': False,
+    'simulate': True,
+    'host': '127.0.0.1',
+    'port': 0,
+    'depth': 5,
+    'publish_seconds': 0.25,
+    'rate': 2000,
+}
+# Limits (intraday_core.limits): a limit breaches after `debounce` ticks above trigger and clears after `debounce`
+# ticks below release. VaR/Imb/Vol are the portfolio limits that raise the fence; per_period limits apply to
+# every blotter row and are journaled only when their first row breaches or their last row clears. Transitions
+# are written to the execution journal.
+LIMITS = {
+    'VaR': {'trigger': 100, 'release': 90, 'debounce': 2},
+    'Imb': {'trigger': 5, 'release': 4, 'debounce': 2},
+    'Vol': {'trigger': 8, 'release': 7.5, 'debounce': 2},
+    'Residual': {'trigger': 150, 'release': 120, 'debounce': 3, 'per_period': True},
+}
@@ -0,0 +1,4 @@
+"""Dashboard engine without Streamlit: price loading, time grids, risk, blotter/strategy logic, curves and the journal.
+
+The Streamlit pages only cache, schedule and render what these modules compute.
+"""
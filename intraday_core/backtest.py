@@ -0,0 +1,215 @@
+"""Replay the blotter's strategy and fence rules over a day × period price history.
+
+    python -m intraday_core.backtest --store .cache/entsoe_prices.sqlite --start 2025-01-01 --end 2025-12-31 \
+        --large-lob 50 60 70 --var-limit 80 100 120 --output sweep.csv
+
+The ID market is not in the history, so each day's price is the entry and the next day's price for the same
+period is the exit (the day-over-day change risk.RiskModel uses as a scenario). LOB depth, imbalance and
+positions are drawn per day from a seed that depends only on the day, so every parameter combination sees
+the same market and differences between rows come from the rules alone.
+
+Each strategy executes its clip differently (execute): Market takes the whole clip at once, paying the half
+spread plus impact that grows with the share of the counter side it takes; Iceberg rests at the touch and
+collects part of the counter-side depth; Ladder rests on several levels, fills a fixed share of them and earns
+the touch plus the average improvement of the rungs; Leer waits and does not trade. Resting orders are
+adversely selected: when the price moves through them they fill completely. Unfenced residuals ride the move,
+fenced ones are capped by the collar.
+"""
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import pandas as pd
+from config import LIMITS
+from . import blotter, entsoe, overview, timegrid
+
+WINDOW_DAYS = 30
+HOURS_PER_DAY = 24
+CHUNK_DAYS = 31
+COMBOS_PER_TASK = 50
+# Collar strikes sit this far either side of the mid (as in build_blotter)
+COLLAR_WIDTH = 2.0
+CONFIDENCE = 0.95
+# Execution model (€/MWh and shares of the clip): build_blotter quotes bid/offer 0.1 either side of the mid
+HALF_SPREAD = 0.1
+MARKET_IMPACT = 0.5
+ICEBERG_FILL = 0.5
+LADDER_FILL = 0.6
+LADDER_IMPROVEMENT = 0.2
+
+# Parameters a sweep can vary, with the live dashboard's values as defaults
+DEFAULTS = {
+    'small_lob': blotter.SMALL_LOB, 'iceberg_lob': blotter.ICEBERG_LOB, 'large_lob': blotter.LARGE_LOB,
+    'iceberg_imbalance': blotter.ICEBERG_IMBALANCE, 'size_pct': blotter.SIZE_PCT,
+    'var_limit': LIMITS['VaR']['trigger'], 'imb_limit': LIMITS['Imb']['trigger'], 'vol_limit': LIMITS['Vol']['trigger'],
+}
+RULE_PARAMS = ['small_lob', 'iceberg_lob', 'large_lob', 'iceberg_imbalance']
+LOB_PARAMS = ['small_lob', 'iceberg_lob', 'large_lob']
+# Task results per combination: clip P&L, trades and winning trades per strategy, then the unfenced residual's
+# P&L, the collared residual's P&L, days, fence days and the sum of squared daily P&L, all additive across day blocks
+N_STRATEGIES = len(blotter.STRATEGIES)
+N_RESULTS = 3 * N_STRATEGIES + 5
+STRATEGY = {name: code for code, name in enumerate(blotter.STRATEGIES)}
+# Strategies that work a clip; Collar hedges the residual and shows as its own P&L column
+TRADING = ['Market', 'Iceberg', 'Ladder', 'Leer']
+
+def param_grid(**values):
+    """Every combination of the given parameter lists, the others at DEFAULTS"""
+    unknown = set(values) - set(DEFAULTS)
+    if unknown: raise ValueError(f"Unknown backtest parameters {sorted(unknown)}")
+    names = list(values)
+    return [{**DEFAULTS, **dict(zip(names, combo))} for combo in itertools.product(*values.values())]
+
+def day_inputs(days, periods, seed=0):
+    """draw_tick_inputs per day as (days, periods) arrays plus the tick's portfolio imbalance, from a per-day seed"""
+    draws = []
+    for day in days:
+        rng = np.random.RandomState([seed, day.toordinal()])
+        inputs = blotter.draw_tick_inputs(periods, rng)
+        inputs['imb'] = rng.randint(*overview.SCALAR_DRAWS['imb'])
+        draws.append(inputs)
+    return {name: np.stack([inputs[name] for inputs in draws]) for name in draws[0]}
+
+def trailing_risk(changes, positions, window=WINDOW_DAYS, confidence=CONFIDENCE):
+    """Historical VaR (€k) and position-weighted vol of each day's positions over the window of changes before it.
+
+    changes[d] are the changes up to day d; positions[i] is valued against changes[i:i + window].
+    """
+    scenarios = np.lib.stride_tricks.sliding_window_view(np.nan_to_num(changes), window, axis=0)[:len(positions)]
+    pnl = np.einsum('dpw,dp->dw', scenarios, positions)
+    var = -np.percentile(pnl, (1 - confidence) * 100, axis=1) / 1000
+    gross = np.abs(positions).sum(axis=1, keepdims=True)
+    weights = np.abs(positions) / np.where(gross > 0, gross, 1)
+    vol = np.einsum('dpw,dp->dw', scenarios, weights).std(axis=1, ddof=1)
+    return var, vol
+
+def execute(action, size, lob_mw, bid_imb, change):
+    """(filled MW, €/MWh earned on each filled MW versus the entry price) of each clip under its strategy"""
+    direction = np.sign(size)
+    counter = lob_mw * np.where(direction > 0, 1 - bid_imb, bid_imb)
+    clip = np.abs(size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        iceberg_share = np.minimum(1, ICEBERG_FILL * counter / clip)
+        market_edge = -(HALF_SPREAD + MARKET_IMPACT * np.minimum(clip / counter, 1))
+    # Resting orders fill completely when the exit price moved through them
+    through = direction * change < 0
+    strategies = [action == STRATEGY['Market'], action == STRATEGY['Iceberg'], action == STRATEGY['Ladder']]
+    share = np.select(strategies, [1.0, np.where(through, 1.0, iceberg_share), np.where(through, 1.0, LADDER_FILL)], default=0.0)
+    edge = np.select(strategies, [market_edge, HALF_SPREAD, HALF_SPREAD + LADDER_IMPROVEMENT], default=0.0)
+    return np.nan_to_num(size * share), np.nan_to_num(edge)
+
+def _run_task(task):
+    # One block of days × combinations; module level so a process pool can pickle it
+    entry, exit_, inputs, ptf_var, ptf_vol, hours, combos = task
+    change = exit_ - entry
+    traded_price = ~np.isnan(change)
+    change = np.nan_to_num(change)
+    residual = blotter.residuals(inputs).astype(float)
+    lob_mw, bid_imb = inputs['lob_mw'], inputs['bid_imb']
+    direction = np.where(bid_imb > 1 - bid_imb, 1.0, -1.0)
+    results = np.zeros((len(combos), N_RESULTS))
+    for i, params in enumerate(combos):
+        fence = (ptf_var > params['var_limit']) | (np.abs(inputs['imb']) > params['imb_limit']) | (ptf_vol > params['vol_limit'])
+        action = blotter.select_strategy(fence[:, None], lob_mw, bid_imb, 1 - bid_imb, **{name: params[name] for name in RULE_PARAMS})
+        size = direction * lob_mw * blotter.lob_size_pct(lob_mw, params['size_pct'], **{name: params[name] for name in LOB_PARAMS})
+        filled, edge = execute(action, size, lob_mw, bid_imb, change)
+        # Strategies are credited with their filled clip only; unfenced the residual rides the move, fenced the
+        # collar caps it. MW × hours of delivery values each period as MWh
+        trade_pnl = (filled * change + np.abs(filled) * edge) * hours * traded_price
+        fenced = np.broadcast_to(fence[:, None], change.shape)
+        residual_pnl = np.where(fenced, 0, residual * change) * hours * traded_price
+        collar_pnl = np.where(fenced, residual * np.clip(change, -COLLAR_WIDTH, COLLAR_WIDTH), 0) * hours * traded_price
+        traded = traded_price & (filled != 0)
+        results[i, :N_STRATEGIES] = np.bincount(action.ravel(), weights=trade_pnl.ravel(), minlength=N_STRATEGIES)
+        results[i, N_STRATEGIES:2 * N_STRATEGIES] = np.bincount(action[traded], minlength=N_STRATEGIES)
+        results[i, 2 * N_STRATEGIES:3 * N_STRATEGIES] = np.bincount(action[traded & (trade_pnl > 0)], minlength=N_STRATEGIES)
+        daily = (trade_pnl + residual_pnl + collar_pnl).sum(axis=1)
+        results[i, -5:] = residual_pnl.sum(), collar_pnl.sum(), len(daily), fence.sum(), (daily ** 2).sum()
+    return results
+
+def _tasks(prices, combos, window, chunk_days, combos_per_task, seed, hours):
+    values = prices.to_numpy(dtype=float)
+    changes = np.diff(values, axis=0)
+    # Tradable days have a full window of changes before them and a next day to exit on
+    first, last = window, len(values) - 2
+    for start in range(first, last + 1, chunk_days):
+        stop = min(start + chunk_days, last + 1)
+        days = list(prices.index[start:stop])
+        inputs = day_inputs(days, values.shape[1], seed)
+        energy = blotter.residuals(inputs) * hours
+        ptf_var, ptf_vol = trailing_risk(changes[start - window:stop - 1], energy, window)
+        for lo in range(0, len(combos), combos_per_task):
+            yield lo, (values[start:stop], values[start + 1:stop + 1], inputs, ptf_var, ptf_vol, hours, combos[lo:lo + combos_per_task])
+
+def run(prices, combos=None, window=WINDOW_DAYS, workers=None, chunk_days=CHUNK_DAYS, combos_per_task=COMBOS_PER_TASK, seed=0, hours=None):
+    """P&L and hit-rate table, one row per parameter combination (param_grid), over every tradable day of prices.
+
+    Days are vectorized in blocks of chunk_days; blocks × combination batches fan out on a process pool
+    (workers=1 runs inline). hours is the delivery length of each period (timegrid minutes / 60), by default
+    a day over the number of periods; positions are valued as MWh, as in overview.portfolio_risk.
+    """
+    combos = combos or [dict(DEFAULTS)]
+    if len(prices) < window + 2:
+        raise ValueError(f"Need at least {window + 2} days of prices for a {window}-day risk window")
+    totals = np.zeros((len(combos), N_RESULTS))
+    hours = HOURS_PER_DAY / prices.shape[1] if hours is None else hours
+    tasks = _tasks(prices, combos, window, chunk_days, combos_per_task, seed, hours)
+    if workers == 1:
+        for lo, task in tasks:
+            totals[lo:lo + len(task[-1])] += _run_task(task)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(lo, pool.submit(_run_task, task)) for lo, task in tasks]
+            for lo, future in futures:
+                result = future.result()
+                totals[lo:lo + len(result)] += result
+    return summarize(combos, totals)
+
+def summarize(combos, totals):
+    pnl, trades, wins = (totals[:, k * N_STRATEGIES:(k + 1) * N_STRATEGIES] for k in range(3))
+    residual_pnl, collar_pnl, days, fence_days, daily_sq = totals[:, -5:].T
+    total_pnl = pnl.sum(axis=1) + residual_pnl + collar_pnl
+    mean = total_pnl / days
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table = pd.DataFrame({
+            'P&L €': total_pnl, 'Daily mean €': mean, 'Daily std €': np.sqrt(np.maximum(daily_sq / days - mean ** 2, 0) * days / np.maximum(days - 1, 1)),
+            'Hit rate': wins.sum(axis=1) / trades.sum(axis=1), 'Trades': trades.sum(axis=1).astype(int), 'Fence days': fence_days.astype(int),
+            'Residual P&L €': residual_pnl, 'Collar P&L €': collar_pnl,
+            **{f'{name} P&L €': pnl[:, k] for k, name in enumerate(blotter.STRATEGIES) if name in TRADING},
+            **{f'{name} hit rate': wins[:, k] / trades[:, k] for k, name in enumerate(blotter.STRATEGIES) if name in TRADING},
+        })
+    params = pd.DataFrame([{name: str(value) if isinstance(value, tuple) else value for name, value in combo.items()} for combo in combos])
+    return pd.concat([params, table], axis=1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--store', required=True, help='price store written by entsoe.load_prices')
+    parser.add_argument('--area', default=entsoe.BIDDING_ZONES['CH'])
+    parser.add_argument('--start', type=date.fromisoformat, required=True)
+    parser.add_argument('--end', type=date.fromisoformat, required=True)
+    parser.add_argument('--resolution', default='PT60M', choices=sorted(timegrid.RESOLUTION_MINUTES))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the table as CSV')
+    for name in [name for name in DEFAULTS if name != 'size_pct']:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, nargs='+', default=[DEFAULTS[name]])
+    parser.add_argument('--size-pct', type=lambda text: tuple(float(x) for x in text.split(',')), nargs='+', default=[blotter.SIZE_PCT],
+                        help='six comma-separated shares per bucket, e.g. 0.3,0.5,0.75,1,0.5,0.75')
+    args = parser.parse_args(argv)
+
+    prices = entsoe.read_prices(args.store, args.area, args.start, args.end, timegrid.get(args.resolution))
+    if prices.empty:
+        print(f"No prices for {args.area} between {args.start} and {args.end} in {args.store}", file=sys.stderr)
+        return 1
+    combos = param_grid(**{name: getattr(args, name) for name in DEFAULTS})
+    table = run(prices, combos, workers=args.workers, seed=args.seed, hours=timegrid.get(args.resolution).minutes / 60).sort_values('P&L €', ascending=False)
+    if args.output:
+        table.to_csv(args.output, index=False)
+    print(table.head(20).to_string(index=False))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from . import timegrid
+
+STRATEGIES = ['', 'Market', 'Iceberg', 'Ladder', 'Leer', 'Collar']
+
+def product_history(prices):
+    """Day × product price frame the blotter reads: the 24 hourly aggregates, then the 96 native quarter hours"""
+    if prices.empty: return prices
+    hourly = timegrid.QUARTER_HOURLY.resample(prices, timegrid.HOURLY)
+    return pd.concat([hourly, prices], axis=1, ignore_index=True)
+
+def blotter_grid(hourly=timegrid.HOURLY, sub_hourly=timegrid.QUARTER_HOURLY):
+    # Each hour followed by its own sub-hour periods; col_idx is the product_history column each row reads from
+    n_hours = len(hourly)
+    labels = np.column_stack([hourly.labels, sub_hourly.labels.reshape(n_hours, -1)]).ravel()
+    col_idx = np.column_stack([np.arange(n_hours), n_hours + sub_hourly.index.to_numpy().reshape(n_hours, -1)]).ravel()
+    return labels, col_idx
+
+BLOTTER_LABELS, BLOTTER_COLUMNS = blotter_grid()
+# Delivery hours of each product_history column: the hours, then the quarter hours
+PRODUCT_HOURS = np.repeat([1.0, timegrid.QUARTER_HOURLY.minutes / 60], [len(timegrid.HOURLY), len(timegrid.QUARTER_HOURLY)])
+
+def draw_tick_inputs(n, rng=np.random):
+    # One array per random quantity instead of a dozen scalar draws per row
+    vwap_pct = rng.uniform(-1.5, 2.0, n)
+    return {
+        'fallback_vol': rng.uniform(4, 7, n),
+        'fallback_var': rng.uniform(35, 80, n),
+        'imb_mw': rng.uniform(-4, 4, n),
+        'fallback_da': 50 + rng.uniform(-6, 6, n),
+        'mid_offset': rng.uniform(-1.2, 1.2, n),
+        'lob_mw': rng.uniform(8, 95, n),
+        'vwap_pct': vwap_pct,
+        'bid_imb': 0.5 + np.where(vwap_pct > 0, rng.uniform(-0.3, 0.4, n), rng.uniform(-0.4, 0.3, n)),
+        'ppa_pos': rng.randint(-50, 50, n),
+        'id_pos': rng.randint(-20, 20, n),
+        'da_pos': rng.randint(-100, 100, n),
+    }
+
+# Rule parameters (the backtester sweeps these): LOB MW thresholds, the imbalance that makes a mid-sized LOB an
+# iceberg, and the share of the LOB worked per size bucket (below small, up to iceberg, LOB_BAND above iceberg up
+# to large, more than LOB_BAND above large, the band above iceberg, the band above large)
+SMALL_LOB, ICEBERG_LOB, LARGE_LOB = 25, 40, 60
+ICEBERG_IMBALANCE = 0.7
+SIZE_PCT = (0.30, 0.50, 0.75, 1.00, 0.50, 0.75)
+LOB_BAND = 5
+
+def lob_size_pct(lob_mw, size_pct=SIZE_PCT, small_lob=SMALL_LOB, iceberg_lob=ICEBERG_LOB, large_lob=LARGE_LOB):
+    conditions = [lob_mw < small_lob, lob_mw <= iceberg_lob, (lob_mw >= iceberg_lob + LOB_BAND) & (lob_mw <= large_lob),
+                  lob_mw > large_lob + LOB_BAND, lob_mw < iceberg_lob + LOB_BAND]
+    return np.select(conditions, size_pct[:5], default=size_pct[5])
+
+def select_strategy(fence_active, lob_mw, bid_imb, offer_imb, small_lob=SMALL_LOB, iceberg_lob=ICEBERG_LOB, large_lob=LARGE_LOB, iceberg_imbalance=ICEBERG_IMBALANCE):
+    # Index into STRATEGIES; Collar overrides everything while the fence is up (fence_active may be an array)
+    lob = np.abs(lob_mw)
+    conditions = [lob > large_lob, (lob >= small_lob) & (lob <= iceberg_lob) & (np.maximum(bid_imb, offer_imb) > iceberg_imbalance), lob < small_lob, lob <= large_lob]
+    return np.where(fence_active, 5, np.select(conditions, [1, 2, 3, 4], default=0))
+
+def residuals(inputs):
+    return inputs['ppa_pos'] + inputs['id_pos'] + inputs['da_pos']
+
+def build_blotter(inputs, labels, col_idx, fence_active, price_stats, model=None):
+    """Blotter rows for the products col_idx; price_stats (stats.PriceStats) and model are of the same product history"""
+    # Per-row lookups into vectors computed once per price load, no slicing of the history per tick
+    period = price_stats.position(col_idx)
+    hour_residual = residuals(inputs)
+
+    # Per-row risk from the cached model: one position × sensitivity product
+    if model is None:
+        hourly_vol, hourly_var = inputs['fallback_vol'], inputs['fallback_var']
+    else:
+        has_history = (period >= 0) & model.known[period]
+        # MWh at risk: a quarter-hour MW delivers a quarter of an hour's energy
+        hist_var, _ = model.period_var(hour_residual * PRODUCT_HOURS[col_idx], period)
+        hourly_vol = np.where(has_history, model.sigma[period], inputs['fallback_vol'])
+        hourly_var = np.where(has_history, hist_var / 1000, inputs['fallback_var'])
+
+    last_prices = price_stats.take(price_stats.last, col_idx)
+    da = np.where(np.isnan(last_prices), inputs['fallback_da'], last_prices)
+    id_mid = da + inputs['mid_offset']
+    id_bid, id_offer = id_mid - 0.1, id_mid + 0.1
+    if 'book_bid' in inputs:
+        # Best bid/offer from a live order book (feed.book_inputs) where the period has one
+        live = ~np.isnan(inputs['book_bid'])
+        id_bid = np.where(live, inputs['book_bid'], id_bid)
+        id_offer = np.where(live, inputs['book_ask'], id_offer)
+        id_mid = (id_bid + id_offer) / 2
+    lob_mw = inputs['lob_mw']
+    bid_imb = inputs['bid_imb']
+    offer_imb = 1 - bid_imb
+
+    # Signed MW: LOB-sized clip in the imbalance direction, or the residual hedged by the collar
+    action = select_strategy(fence_active, lob_mw, bid_imb, offer_imb)
+    if fence_active:
+        size = (-hour_residual).astype(np.float64)
+        put, call = id_mid - 2, id_mid + 2
+    else:
+        size = np.where(bid_imb > offer_imb, 1.0, -1.0) * lob_mw * lob_size_pct(lob_mw)
+        size[action == 0] = np.nan
+        put = call = np.full(len(labels), np.nan)
+
+    return pd.DataFrame({
+        'Hour': labels,
+        'DA€': da,
+        'ID Bid€': id_bid,
+        'Bid MW': np.trunc(lob_mw * bid_imb).astype(np.int32),
+        'ID Offer€': id_offer,
+        'Offer MW': np.trunc(lob_mw * offer_imb).astype(np.int32),
+        'Mid€': id_mid,
+        'Shape': inputs['vwap_pct'],
+        'Var': hourly_var,
+        'Imb': inputs['imb_mw'],
+        'Vol': hourly_vol,
+        'LOB': np.trunc(lob_mw).astype(np.int32),
+        'Residual': hour_residual.astype(np.int32),
+        'Size': size,
+        'Put€': put,
+        'Call€': call,
+        'Strategy': pd.Categorical.from_codes(action, categories=STRATEGIES),
+    })
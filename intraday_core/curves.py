@@ -0,0 +1,196 @@
+import bisect
+from collections import deque
+import numpy as np
+import pandas as pd
+
+class RingBuffer:
+    """Fixed-capacity window of float rows backed by a single NumPy array.
+
+    Rows are written past the live window and slid back to the front only when the slack runs out, so
+    append is O(1) amortised and view() is always one contiguous, zero-copy slice. A view handed to a
+    reader stays valid for at least (slack - 2) * capacity further appends.
+    """
+
+    def __init__(self, capacity, columns, slack=4):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self._data = np.full((capacity * max(slack, 3), len(self.columns)), np.nan)
+        self._end = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _make_room(self, n):
+        if self._end + n <= len(self._data): return
+        keep = min(self._size, self.capacity - n)
+        self._data[:keep] = self._data[self._end - keep:self._end]
+        self._end, self._size = keep, keep
+
+    def append(self, row):
+        self._make_room(1)
+        self._data[self._end] = row
+        self._end += 1
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=float)[-self.capacity:]
+        self._make_room(len(rows))
+        self._data[self._end:self._end + len(rows)] = rows
+        self._end += len(rows)
+        self._size = min(self._size + len(rows), self.capacity)
+
+    def view(self):
+        window = self._data[self._end - self._size:self._end].view()
+        window.flags.writeable = False
+        return window
+
+    def column(self, name):
+        return self.view()[:, self.columns.index(name)]
+
+    def frame(self):
+        return pd.DataFrame(self.view(), columns=self.columns, copy=False)
+
+def spread_rows(base, other):
+    """Rows of [base, other, spread, spread %] rounded for display, for scalars or whole arrays"""
+    base, other = np.atleast_1d(base).astype(float), np.atleast_1d(other).astype(float)
+    spread = other - base
+    return np.column_stack([np.round(base, 2), np.round(other, 2), np.round(spread, 2), np.round(spread / base * 100, 1)])
+
+def random_curve(shape, rng=np.random):
+    """Fake base/other curves with realistic spreads, one row per period of the shape"""
+    base = shape + rng.uniform(-3, 3, len(shape))
+    return spread_rows(base, base + rng.uniform(-2.0, 3.0, len(shape)))
+
+def random_curve_row(base_price, rng=np.random):
+    base = base_price + rng.uniform(-3, 3)
+    return spread_rows(base, base + rng.uniform(-2.0, 3.0))[0]
+
+def border_curve(prices, periods, base='CH', other='FR'):
+    # Latest periods with both zones published; the spread is a plain column difference
+    both = prices[[base, other]].dropna().tail(periods)
+    return spread_rows(both[base].to_numpy(), both[other].to_numpy())
+
+class RollingStats:
+    """O(1) rolling mean/variance (Welford with removal) and max/min (monotonic deques) over the last window values.
+
+    Percentiles come from a sorted copy of the window kept with bisect, so they cost O(log n) to find and a
+    memmove to update rather than a full sort per tick.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self._sorted = []
+        self._max = deque()
+        self._min = deque()
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._seen = 0
+
+    def __len__(self):
+        return self._count
+
+    def push(self, x):
+        x = float(x)
+        if self._count == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(x)
+        bisect.insort(self._sorted, x)
+        self._count += 1
+        delta = x - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (x - self._mean)
+        # Monotonic deques of (sequence, value); stale heads fall out of the window
+        while self._max and self._max[-1][1] <= x: self._max.pop()
+        while self._min and self._min[-1][1] >= x: self._min.pop()
+        self._max.append((self._seen, x))
+        self._min.append((self._seen, x))
+        for extremes in (self._max, self._min):
+            if extremes[0][0] <= self._seen - self.window: extremes.popleft()
+        self._seen += 1
+
+    def extend(self, values):
+        for x in values: self.push(x)
+
+    def _remove(self, x):
+        del self._sorted[bisect.bisect_left(self._sorted, x)]
+        self._count -= 1
+        if self._count == 0:
+            self._mean, self._m2 = 0.0, 0.0
+            return
+        delta = x - self._mean
+        self._mean -= delta / self._count
+        self._m2 = max(self._m2 - delta * (x - self._mean), 0.0)
+
+    @property
+    def mean(self):
+        return self._mean if self._count else np.nan
+
+    @property
+    def std(self):
+        # Sample std (ddof=1), same as pandas .std()
+        return np.sqrt(self._m2 / (self._count - 1)) if self._count > 1 else np.nan
+
+    @property
+    def max(self):
+        return self._max[0][1] if self._max else np.nan
+
+    @property
+    def min(self):
+        return self._min[0][1] if self._min else np.nan
+
+    def percentile(self, q):
+        # Linear interpolation between closest ranks, as np.percentile
+        if not self._sorted: return np.nan
+        rank = (len(self._sorted) - 1) * q / 100
+        lo = int(rank)
+        hi = min(lo + 1, len(self._sorted) - 1)
+        return self._sorted[lo] + (self._sorted[hi] - self._sorted[lo]) * (rank - lo)
+
+    def zscore(self):
+        """How unusual the newest value is relative to the window"""
+        std = self.std
+        return (self._values[-1] - self._mean) / std if self._values and std > 0 else np.nan
+
+    def snapshot(self):
+        return {
+            'count': self._count, 'mean': self.mean, 'std': self.std, 'max': self.max, 'min': self.min,
+            'p05': self.percentile(5), 'p50': self.percentile(50), 'p95': self.percentile(95), 'zscore': self.zscore(),
+        }
+
+def curve_stats(rows, spread_column=2):
+    """Spread stats of a whole curve at once, same keys as RollingStats.snapshot()"""
+    stats = RollingStats(max(len(rows), 1))
+    stats.extend(rows[:, spread_column])
+    return stats.snapshot()
+
+class CurveWindows:
+    """Synthetic curves per resolution, each a RingBuffer window plus its RollingStats, rolled one row per tick.
+
+    shapes maps a window name to its base price shape; the window holds one row per period of the shape.
+    """
+
+    def __init__(self, shapes, columns, spread_column='Spread €', rng=np.random):
+        self.shapes = shapes
+        self.rng = rng
+        self.spread = list(columns).index(spread_column)
+        self.buffers = {name: RingBuffer(len(shape), columns) for name, shape in shapes.items()}
+        self.stats = {name: RollingStats(len(shape)) for name, shape in shapes.items()}
+        for name, shape in shapes.items():
+            self.buffers[name].extend(random_curve(shape, rng))
+            self.stats[name].extend(self.buffers[name].column(spread_column))
+
+    def draw(self, rng=None):
+        # Use the shape's first period for the new "H1"
+        return {name: random_curve_row(shape[0], rng or self.rng) for name, shape in self.shapes.items()}
+
+    def tick(self, rows=None):
+        # One O(1) append per window; readers get zero-copy views and precomputed spread stats
+        for name, row in (rows or self.draw()).items():
+            self.buffers[name].append(row)
+            self.stats[name].push(row[self.spread])
+        views = {name: buffer.view() for name, buffer in self.buffers.items()}
+        views['stats'] = {name: window_stats.snapshot() for name, window_stats in self.stats.items()}
+        return views
@@ -0,0 +1,299 @@
+import functools
+import io
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from datetime import datetime, timedelta, timezone, time as dtime
+import numpy as np
+import pandas as pd
+import requests
+import xml.etree.ElementTree as ET
+from . import timegrid
+
+ENTSOE_API_URL = "https://web-api.tp.entsoe.eu/api"
+# EIC codes of the bidding zones the dashboard compares
+BIDDING_ZONES = {
+    'CH': "10YCH-SWISSGRID",
+    'FR': "10YFR-RTE------C",
+    'DE': "10Y1001A1001A82H",  # DE-LU
+    'IT': "10Y1001A1001A73I",  # IT-North, the zone bordering CH
+    'AT': "10YAT-APG------L",
+}
+A44_NAMESPACE = {'ns': 'urn:iec62325.351:tc57wg16:451-3:publicationdocument:7:0'}
+RESOLUTION_MINUTES = {'PT15M': 15, 'PT30M': 30, 'PT60M': 60, 'P1D': 1440}
+
+# Fetch layer: long ranges go out as CHUNK_DAYS requests (the API caps A44 at one year per query)
+CHUNK_DAYS = 31
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 1.0
+REQUEST_TIMEOUT = (5, 60)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# A delivery day counts as final once it is in the past and (almost) fully published (23h on DST days)
+MIN_FINAL_FRACTION = 23 / 24
+
+# Prices are stored natively per quarter hour; hourly documents are repeated over their quarters
+STORE_GRID = timegrid.QUARTER_HOURLY
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS day_ahead_periods (
+    area TEXT NOT NULL, day TEXT NOT NULL, period INTEGER NOT NULL, price REAL,
+    PRIMARY KEY (area, day, period)
+);
+CREATE TABLE IF NOT EXISTS delivery_days (
+    area TEXT NOT NULL, day TEXT NOT NULL, final INTEGER NOT NULL, fetched_at TEXT NOT NULL,
+    PRIMARY KEY (area, day)
+);
+"""
+
+# --- A44 request / parse ---
+@functools.lru_cache(maxsize=None)
+def _session():
+    # One keep-alive pool shared by every chunk request in the process
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def _backoff(attempt, retry_after=None):
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_SECONDS * 2 ** attempt * (1 + random.random())
+
+def request_prices(api_key, area_code, start_date, end_date, api_url=ENTSOE_API_URL):
+    params = {
+        'securityToken': api_key, 'documentType': 'A44', 'in_Domain': area_code,
+        'out_Domain': area_code, 'periodStart': start_date.strftime('%Y%m%d%H%M'),
+        'periodEnd': end_date.strftime('%Y%m%d%H%M'),
+    }
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = _session().get(api_url, params=params, timeout=REQUEST_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == MAX_RETRIES: raise
+            time.sleep(_backoff(attempt))
+            continue
+        if response.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            # Rate limited or briefly unavailable: honour Retry-After, else exponential backoff with jitter
+            time.sleep(_backoff(attempt, response.headers.get('Retry-After')))
+            continue
+        response.raise_for_status()
+        return parse_a44(response.content)
+
+def _day_chunks(days, chunk_days=CHUNK_DAYS):
+    # Consecutive days grouped so each gap costs one request per chunk_days window
+    chunks = []
+    for day in days:
+        if chunks and day == chunks[-1][-1] + timedelta(days=1) and len(chunks[-1]) < chunk_days: chunks[-1].append(day)
+        else: chunks.append([day])
+    return chunks
+
+def _fetch_tasks(api_key, tasks, api_url, max_workers):
+    # tasks are (area_code, chunk) pairs; all areas share one bounded pool and one session. Yields each
+    # (task, price_df) as its request completes
+    def fetch(task):
+        area_code, chunk = task
+        start = datetime.combine(chunk[0], dtime.min)
+        end = datetime.combine(chunk[-1] + timedelta(days=1), dtime.min)
+        return task, request_prices(api_key, area_code, start, end, api_url)
+    if len(tasks) <= 1:
+        yield from map(fetch, tasks)
+        return
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(tasks)))
+    try:
+        for future in as_completed([pool.submit(fetch, task) for task in tasks]):
+            yield future.result()
+    finally:
+        # A failed chunk ends the refresh; chunks not yet requested are left for the next call
+        pool.shutdown(cancel_futures=True)
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def _parse_time(text):
+    return datetime.fromisoformat(text.replace('Z', '+00:00'))
+
+class _PriceGrid:
+    """Preallocated day × slot accumulator; finer points are averaged into a slot, coarser ones repeated over it"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.slot_minutes = grid.minutes
+        self.first_day = None
+        self.sums = np.zeros((0, grid.periods))
+        self.counts = np.zeros((0, grid.periods), dtype=np.int32)
+
+    def allocate(self, start, end):
+        self.first_day = start.date()
+        n_days = max((end - timedelta(minutes=1)).date().toordinal() - self.first_day.toordinal() + 1, 1)
+        self.sums = np.zeros((n_days, self.grid.periods))
+        self.counts = np.zeros((n_days, self.grid.periods), dtype=np.int32)
+
+    def _grow(self, lo, hi):
+        # Only hit when a document omits (or understates) its period.timeInterval
+        pad = ((max(-lo, 0), max(hi - len(self.sums) + 1, 0)), (0, 0))
+        self.sums, self.counts = np.pad(self.sums, pad), np.pad(self.counts, pad)
+        self.first_day -= timedelta(days=pad[0][0])
+
+    def add(self, period_start, step_minutes, values):
+        if self.first_day is None:
+            self.allocate(period_start, period_start + timedelta(days=1))
+        reps = max(step_minutes // self.slot_minutes, 1)
+        origin = datetime.combine(self.first_day, dtime.min, tzinfo=period_start.tzinfo)
+        offset = int((period_start - origin).total_seconds() // 60)
+        minutes = offset + np.repeat(np.arange(len(values)) * step_minutes, reps) + np.tile(np.arange(reps) * self.slot_minutes, len(values))
+        values = np.repeat(values, reps)
+        valid = ~np.isnan(values)
+        days, slots = np.divmod(minutes[valid], 1440)
+        if len(days) and (days.min() < 0 or days.max() >= len(self.sums)):
+            self._grow(days.min(), days.max())
+            days = days - min(days.min(), 0)
+        slots //= self.slot_minutes
+        np.add.at(self.sums, (days, slots), values[valid])
+        np.add.at(self.counts, (days, slots), 1)
+
+    def to_frame(self):
+        if self.first_day is None or not self.counts.any(): return pd.DataFrame()
+        with np.errstate(invalid='ignore'):
+            prices = np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+        has_data = self.counts.any(axis=1)
+        days = [self.first_day + timedelta(days=int(i)) for i in np.flatnonzero(has_data)]
+        return pd.DataFrame(prices[has_data], index=pd.Index(days, name='day'), columns=self.grid.index)
+
+def _period_values(positions, prices, n_positions, fill_gaps):
+    values = np.full(n_positions, np.nan)
+    in_range = (positions >= 1) & (positions <= n_positions)
+    values[positions[in_range] - 1] = prices[in_range]
+    if fill_gaps:
+        # curveType A03: a point holds its price until the next reported position
+        idx = np.where(np.isnan(values), 0, np.arange(n_positions))
+        np.maximum.accumulate(idx, out=idx)
+        values = values[idx]
+    return values
+
+def parse_a44(content, grid=STORE_GRID):
+    """Day × period price matrix (UTC) on a timegrid.TimeGrid from an A44 publication document, streamed with iterparse"""
+    grid = _PriceGrid(grid)
+    curve_type, interval, resolution = None, {}, None
+    positions, prices = [], []
+    point = {}
+    for event, elem in ET.iterparse(io.BytesIO(content), events=('end',)):
+        tag = _local(elem.tag)
+        if tag == 'position':
+            point['position'] = int(elem.text)
+        elif tag == 'price.amount':
+            point['price'] = float(elem.text)
+        elif tag == 'Point':
+            positions.append(point.get('position', 0))
+            prices.append(point.get('price', np.nan))
+            point = {}
+            elem.clear()
+        elif tag in ('start', 'end'):
+            interval[tag] = _parse_time(elem.text)
+        elif tag == 'period.timeInterval':
+            # Document-level window: size the grid once up front
+            grid.allocate(interval['start'], interval['end'])
+            interval = {}
+        elif tag == 'resolution':
+            resolution = elem.text
+        elif tag == 'curveType':
+            curve_type = elem.text
+        elif tag == 'Period':
+            step = RESOLUTION_MINUTES[resolution]
+            n_positions = int((interval['end'] - interval['start']).total_seconds() // 60 // step)
+            values = _period_values(np.array(positions, dtype=np.int64), np.array(prices, dtype=float), n_positions, curve_type == 'A03')
+            grid.add(interval['start'], step, values)
+            positions, prices, interval, resolution = [], [], {}, None
+            elem.clear()
+        elif tag == 'TimeSeries':
+            curve_type = None
+            elem.clear()
+    return grid.to_frame()
+
+# --- On-disk store (SQLite in WAL mode, shared by every worker on the box) ---
+def _connect(path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(_SCHEMA)
+    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        _migrate(conn)
+    return conn
+
+def _migrate(conn):
+    # v1 stored one row per hour: spread each onto its quarters (what parsing the hourly document gives)
+    with conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'day_ahead_prices'").fetchone():
+            quarters = " UNION ALL ".join(f"SELECT {q} AS q" for q in range(STORE_GRID.per_hour))
+            conn.execute(
+                f"INSERT OR IGNORE INTO day_ahead_periods SELECT area, day, hour * {STORE_GRID.per_hour} + q, price "
+                f"FROM day_ahead_prices, ({quarters})")
+            conn.execute("DROP TABLE day_ahead_prices")
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def final_days(path, area_code, first_day, last_day):
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT day FROM delivery_days WHERE area = ? AND final = 1 AND day BETWEEN ? AND ?",
+            (area_code, first_day.isoformat(), last_day.isoformat()),
+        ).fetchall()
+    return {datetime.strptime(day, '%Y-%m-%d').date() for (day,) in rows}
+
+def write_prices(path, area_code, price_df, days):
+    # Every requested day is recorded, so a day the API had nothing for is retried next time
+    today = datetime.now(timezone.utc).date()
+    points = price_df.count(axis=1) if not price_df.empty else pd.Series(dtype=int)
+    fetched_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    price_rows = [(area_code, day.isoformat(), int(period), float(price)) for (day, period), price in price_df.stack().items()] if not price_df.empty else []
+    min_points = STORE_GRID.periods * MIN_FINAL_FRACTION
+    day_rows = [(area_code, day.isoformat(), int(day < today and points.get(day, 0) >= min_points), fetched_at) for day in days]
+    with closing(_connect(path)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO day_ahead_periods VALUES (?, ?, ?, ?)", price_rows)
+        conn.executemany("INSERT OR REPLACE INTO delivery_days VALUES (?, ?, ?, ?)", day_rows)
+
+def read_prices(path, area_code, first_day, last_day, grid=STORE_GRID):
+    with closing(_connect(path)) as conn:
+        df = pd.read_sql_query(
+            "SELECT day, period, price FROM day_ahead_periods WHERE area = ? AND day BETWEEN ? AND ? ORDER BY day, period",
+            conn, params=(area_code, first_day.isoformat(), last_day.isoformat()),
+        )
+    if df.empty: return pd.DataFrame()
+    df['day'] = pd.to_datetime(df['day']).dt.date
+    price_df = df.pivot(index='day', columns='period', values='price').reindex(columns=STORE_GRID.index)
+    return STORE_GRID.resample(price_df, grid)
+
+def _refresh_store(api_key, area_codes, days, store_path, api_url):
+    tasks = []
+    for area_code in area_codes:
+        cached = final_days(store_path, area_code, days[0], days[-1])
+        tasks += [(area_code, chunk) for chunk in _day_chunks([day for day in days if day not in cached])]
+    # Each chunk is stored as it arrives, so a failure only costs the chunks still missing
+    for (area_code, chunk), price_df in _fetch_tasks(api_key, tasks, api_url, MAX_WORKERS):
+        write_prices(store_path, area_code, price_df, chunk)
+
+def _window(end_day, days_to_fetch):
+    return [end_day - timedelta(days=i) for i in range(days_to_fetch, -1, -1)]
+
+def load_prices(api_key, area_code, end_day, days_to_fetch, store_path, api_url=ENTSOE_API_URL, grid=STORE_GRID):
+    """Day × period prices on grid for the window ending on end_day, fetching only days not yet final in the store"""
+    days = _window(end_day, days_to_fetch)
+    _refresh_store(api_key, [area_code], days, store_path, api_url)
+    return read_prices(store_path, area_code, days[0], days[-1], grid)
+
+def load_area_prices(api_key, areas, end_day, days_to_fetch, store_path, api_url=ENTSOE_API_URL, grid=timegrid.HOURLY):
+    """Prices on grid for several bidding zones aligned on one UTC timestamp index, one column per area name"""
+    days = _window(end_day, days_to_fetch)
+    _refresh_store(api_key, list(areas.values()), days, store_path, api_url)
+    values = np.full((len(areas), len(days) * grid.periods), np.nan)
+    for i, area_code in enumerate(areas.values()):
+        price_df = read_prices(store_path, area_code, days[0], days[-1], grid)
+        if not price_df.empty:
+            values[i] = price_df.reindex(index=days, columns=grid.index).to_numpy(dtype=float).ravel()
+    index = pd.date_range(days[0], periods=len(days) * grid.periods, freq=f'{grid.minutes}min', tz='UTC', name='time')
+    return pd.DataFrame(values.T, index=index, columns=list(areas))
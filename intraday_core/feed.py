@@ -0,0 +1,301 @@
+import abc
+import asyncio
+import json
+import logging
+import threading
+import time
+import numpy as np
+from . import instrument
+from .ticks import Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Wire format: newline-delimited JSON, each line one message or a list of messages
+#   ['S', period, side, prices, qtys]         replace one side of a period's book, best level first
+#   ['L', period, side, level, price, qty]    set one level (qty 0 clears it)
+#   ['T', period, price, qty]                 trade
+# side is 0 for bids, 1 for asks
+BID, ASK = 0, 1
+READ_BYTES = 1 << 16
+RECONNECT_SECONDS = 0.5
+MAX_RECONNECT_SECONDS = 10.0
+
+class OrderBook:
+    """Top levels of both sides of every delivery period in (periods, depth) arrays, plus last trade and volume.
+
+    Each message is a handful of scalar array writes, so applying one costs the same however many periods
+    there are. snapshot() copies the arrays for readers on other threads.
+    """
+
+    def __init__(self, periods, depth=5):
+        self.periods = periods
+        self.depth = depth
+        self.px = np.full((2, periods, depth), np.nan)
+        self.qty = np.zeros((2, periods, depth))
+        self.last_px = np.full(periods, np.nan)
+        self.volume = np.zeros(periods)
+        self.updates = 0
+
+    def replace(self, period, side, prices, qtys):
+        n = min(len(prices), self.depth)
+        self.px[side, period, :n] = prices[:n]
+        self.qty[side, period, :n] = qtys[:n]
+        self.px[side, period, n:] = np.nan
+        self.qty[side, period, n:] = 0
+
+    def level(self, period, side, level, price, qty):
+        if level >= self.depth: return
+        self.px[side, period, level] = price if qty else np.nan
+        self.qty[side, period, level] = qty
+
+    def trade(self, period, price, qty):
+        self.last_px[period] = price
+        self.volume[period] += qty
+
+    def apply(self, message):
+        kind, period = message[0], message[1]
+        if not 0 <= period < self.periods: return
+        if kind == 'L': self.level(period, *message[2:])
+        elif kind == 'S': self.replace(period, *message[2:])
+        elif kind == 'T': self.trade(period, *message[2:])
+        else: return
+        self.updates += 1
+
+    def snapshot(self):
+        return {
+            'bid_px': self.px[BID].copy(), 'bid_qty': self.qty[BID].copy(),
+            'ask_px': self.px[ASK].copy(), 'ask_qty': self.qty[ASK].copy(),
+            'last_px': self.last_px.copy(), 'volume': self.volume.copy(), 'updates': self.updates,
+        }
+
+def decode_line(line):
+    message = json.loads(line)
+    return message if message and isinstance(message[0], list) else [message]
+
+class FeedAdapter(abc.ABC):
+    """Where order-book messages come from.
+
+    stream() is an async iterator of message batches; it returns or raises when the connection drops and is
+    called again to reconnect. Subclass it for other transports (a websocket client, a vendor API).
+    """
+
+    @abc.abstractmethod
+    async def stream(self):
+        """Async generator of message batches for one connection"""
+
+class TcpFeed(FeedAdapter):
+    """Newline-delimited JSON over TCP; every read is split into lines and handed on as one batch"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def stream(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            pending = b''
+            while chunk := await reader.read(READ_BYTES):
+                *lines, pending = (pending + chunk).split(b'\n')
+                yield [message for line in lines if line.strip() for message in decode_line(line)]
+        finally:
+            writer.close()
+
+class MarketFeed:
+    """Consumes an adapter on its own asyncio loop (daemon thread) into an OrderBook and publishes coalesced snapshots.
+
+    However many messages arrive, readers see at most one new versioned snapshot per publish_seconds, and only
+    when the book changed. latest() never blocks on the network; hold one per process with st.cache_resource.
+    """
+
+    def __init__(self, adapter, periods, depth=5, publish_seconds=0.25, name='market-feed'):
+        self.adapter = adapter
+        self.book = OrderBook(periods, depth)
+        self.publish_seconds = publish_seconds
+        self.name = name
+        self.connected = False
+        self._published = threading.Condition()
+        self._snapshot = Snapshot(0, time.time(), self.book.snapshot())
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name=name, daemon=True)
+        self._thread.start()
+        self._task = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+
+    async def _run(self):
+        publisher = asyncio.create_task(self._publish_every())
+        try:
+            await self._consume()
+        finally:
+            publisher.cancel()
+
+    async def _consume(self):
+        attempt = 0
+        while True:
+            try:
+                async for batch in self.adapter.stream():
+                    self.connected, attempt = True, 0
+                    for message in batch:
+                        self.book.apply(message)
+                    instrument.RECORDER.count(f'{self.name}.messages', len(batch))
+            except (OSError, ValueError, TypeError, IndexError) as e:
+                logger.warning("Market feed %s dropped: %s", self.name, e)
+            # Reconnect with capped exponential backoff; the last book stays published meanwhile
+            self.connected = False
+            instrument.RECORDER.count(f'{self.name}.reconnect')
+            await asyncio.sleep(min(RECONNECT_SECONDS * 2 ** attempt, MAX_RECONNECT_SECONDS))
+            attempt += 1
+
+    async def _publish_every(self):
+        published = self.book.updates
+        while True:
+            await asyncio.sleep(self.publish_seconds)
+            if self.book.updates == published: continue
+            published = self.book.updates
+            # Copied on the loop thread between batches, so a snapshot never holds half a message
+            with instrument.stage(f'{self.name}.publish'):
+                data = self.book.snapshot()
+            with self._published:
+                self._snapshot = Snapshot(self._snapshot.version + 1, time.time(), data)
+                self._published.notify_all()
+
+    def latest(self):
+        return self._snapshot
+
+    def wait_newer(self, version, timeout=None):
+        with self._published:
+            self._published.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
+
+    def stop(self):
+        """Cancel the consumer and publisher and wait for them to unwind, then stop the loop thread"""
+        async def cancel():
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(cancel(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+class SimulatedExchange:
+    """Local stand-in exchange for tests and demos, serving random-walk books in the TcpFeed wire format.
+
+    Every connection first gets a full snapshot of each period, then about rate messages per second (level
+    updates, trades and mid moves that replace both sides) in batches every batch_seconds. With a seed every
+    connection sees the same stream.
+    """
+
+    def __init__(self, periods, depth=5, rate=2000, batch_seconds=0.05, host='127.0.0.1', port=0, seed=None, mid=50.0, tick=0.1):
+        self.periods = periods
+        self.depth = depth
+        self.rate = rate
+        self.batch_seconds = batch_seconds
+        self.host = host
+        self.port = port
+        self.seed = seed
+        self.mid = np.broadcast_to(np.asarray(mid, dtype=float), (periods,)).copy()
+        self.tick = tick
+        self._loop = asyncio.new_event_loop()
+        self._thread = None
+        self._server = None
+        self._connections = set()
+
+    def start(self):
+        """Start serving on a daemon thread; port is the bound one afterwards (pass port=0 for any free port).
+
+        After stop() it serves again on the same port, e.g. to exercise a feed's reconnect.
+        """
+        started = threading.Event()
+        async def listen():
+            self._server = await asyncio.start_server(self._serve, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+        def run():
+            self._loop.run_until_complete(listen())
+            self._loop.run_forever()
+        self._thread = threading.Thread(target=run, name='simulated-exchange', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        """Close the listener and every open connection, so clients see the drop, then the loop thread"""
+        async def close():
+            self._server.close()
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def _sides(self, period, mid, rng):
+        # Both sides rebuilt around mid, levels half a tick apart from it and one tick from each other
+        offsets = (np.arange(self.depth) + 0.5) * self.tick
+        return [['S', period, side, np.round(mid - offsets if side == BID else mid + offsets, 2).tolist(), rng.randint(1, 11, self.depth).tolist()]
+                for side in (BID, ASK)]
+
+    def _snapshot_messages(self, mids, rng):
+        return [message for period, mid in enumerate(mids.tolist()) for message in self._sides(period, mid, rng)]
+
+    def _batch(self, mids, rng, n):
+        periods = rng.randint(0, self.periods, n)
+        kinds = rng.uniform(size=n)
+        sides = rng.randint(0, 2, n)
+        levels = rng.randint(0, self.depth, n)
+        qtys = rng.randint(0, 11, n)
+        moves = rng.normal(0, self.tick, n)
+        messages = []
+        for period, kind, side, level, qty, move in zip(periods.tolist(), kinds.tolist(), sides.tolist(), levels.tolist(), qtys.tolist(), moves.tolist()):
+            mid = mids[period]
+            if kind < 0.1:
+                messages.append(['T', period, round(mid + (self.tick if side else -self.tick) / 2, 2), qty or 1])
+            elif kind < 0.2:
+                mids[period] = mid + move
+                messages += self._sides(period, mid + move, rng)
+            else:
+                offset = (level + 0.5) * self.tick
+                messages.append(['L', period, side, level, round(mid - offset if side == BID else mid + offset, 2), qty])
+        return messages
+
+    async def _serve(self, reader, writer):
+        rng = np.random.RandomState(self.seed) if self.seed is not None else np.random.RandomState()
+        mids = self.mid.copy()
+        per_batch = max(int(self.rate * self.batch_seconds), 1)
+        self._connections.add(asyncio.current_task())
+        try:
+            writer.write(json.dumps(self._snapshot_messages(mids, rng)).encode() + b'\n')
+            while True:
+                writer.write(json.dumps(self._batch(mids, rng, per_batch)).encode() + b'\n')
+                await writer.drain()
+                await asyncio.sleep(self.batch_seconds)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+def book_inputs(inputs, book, col_idx):
+    """Tick inputs with LOB depth, imbalance and the ID bid/offer taken from a book snapshot where a period is two-sided.
+
+    col_idx maps blotter rows to book periods; rows without a two-sided book keep their drawn values and get
+    NaN book prices.
+    """
+    bid_qty = book['bid_qty'][col_idx].sum(axis=1)
+    ask_qty = book['ask_qty'][col_idx].sum(axis=1)
+    # Best level ignoring cleared slots (NaN), all-NaN rows stay NaN
+    best_bid, best_ask = np.fmax.reduce(book['bid_px'][col_idx], axis=1), np.fmin.reduce(book['ask_px'][col_idx], axis=1)
+    depth = bid_qty + ask_qty
+    live = ~np.isnan(best_bid) & ~np.isnan(best_ask) & (depth > 0)
+    inputs = dict(inputs)
+    inputs['lob_mw'] = np.where(live, depth, inputs['lob_mw'])
+    inputs['bid_imb'] = np.where(live, bid_qty / np.where(live, depth, 1), inputs['bid_imb'])
+    inputs['book_bid'] = np.where(live, best_bid, np.nan)
+    inputs['book_ask'] = np.where(live, best_ask, np.nan)
+    return inputs
+
+def open_feed(periods, enabled=True, simulate=False, host='127.0.0.1', port=0, depth=5, publish_seconds=0.25, rate=2000, seed=None):
+    """MarketFeed for config.MARKET_FEED; with simulate a SimulatedExchange is started in-process on host:port first"""
+    if not enabled: return None
+    if simulate:
+        port = SimulatedExchange(periods, depth, rate, host=host, port=port, seed=seed).start().port
+    return MarketFeed(TcpFeed(host, port), periods, depth, publish_seconds)
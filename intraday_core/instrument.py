@@ -0,0 +1,134 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+import numpy as np
+
+WINDOW = 1000
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Recorder:
+    """Process-wide stage timings: rolling p50/p95/p99 over the last WINDOW samples plus running count/sum.
+
+    stage() is a plain context-manager timer. Stages opened with sample=True (the producer ticks) also run
+    under cProfile every profile_every-th time and under tracemalloc every tracemalloc_every-th time; 0 turns
+    either off. When export_path is set the JSON and Prometheus-text exports are rewritten at most once per
+    export_seconds.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._totals = defaultdict(lambda: [0, 0.0])
+        self._counters = defaultdict(int)
+        self._peaks = {}
+        self.profiles = {}
+        self.profile_every = 0
+        self.tracemalloc_every = 0
+        self.export_path = None
+        self.export_seconds = 10.0
+        self._last_export = 0.0
+
+    def configure(self, export_path=None, export_seconds=10.0, profile_every=0, tracemalloc_every=0):
+        self.export_path, self.export_seconds = export_path, export_seconds
+        self.profile_every, self.tracemalloc_every = profile_every, tracemalloc_every
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            total = self._totals[name]
+            total[0] += 1
+            total[1] += seconds
+        if self.export_path and time.monotonic() - self._last_export >= self.export_seconds and self._export_lock.acquire(blocking=False):
+            try:
+                self._last_export = time.monotonic()
+                self.export(self.export_path)
+            finally:
+                self._export_lock.release()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _due(self, every, name):
+        return every and self._totals[name][0] % every == every - 1
+
+    @contextmanager
+    def stage(self, name, sample=False):
+        profiling = sample and self._due(self.profile_every, name)
+        tracing = sample and self._due(self.tracemalloc_every, name) and not tracemalloc.is_tracing()
+        # One sampled stage at a time: cProfile and tracemalloc are process-wide
+        sampled = (profiling or tracing) and self._sample_lock.acquire(blocking=False)
+        profiler = cProfile.Profile() if sampled and profiling else None
+        tracing = sampled and tracing
+        if tracing: tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            if profiler:
+                with profiler: yield
+            else:
+                yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+            if tracing:
+                self._peaks[name] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if profiler:
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(20)
+                self.profiles[name] = out.getvalue()
+            if sampled: self._sample_lock.release()
+
+    def snapshot(self):
+        """{stage: {count, sum, mean, max, p50, p95, p99, peak_bytes}} plus the counters"""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items()}
+            totals = {name: tuple(total) for name, total in self._totals.items()}
+            counters = dict(self._counters)
+        stages = {}
+        for name, values in samples.items():
+            count, total = totals[name]
+            stages[name] = {'count': count, 'sum': total, 'mean': total / count, 'max': float(values.max()),
+                            **{f'p{round(q * 100)}': float(np.quantile(values, q)) for q in QUANTILES}}
+            if name in self._peaks: stages[name]['peak_bytes'] = self._peaks[name]
+        return {'stages': stages, 'counters': counters}
+
+    def prometheus(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        lines = ['# HELP intraday_stage_seconds Stage wall time, quantiles over the rolling window',
+                 '# TYPE intraday_stage_seconds summary']
+        for name, stats in sorted(snapshot['stages'].items()):
+            for q in QUANTILES:
+                lines.append(f'intraday_stage_seconds{{stage="{name}",quantile="{q}"}} {stats[f"p{round(q * 100)}"]:.6f}')
+            lines.append(f'intraday_stage_seconds_sum{{stage="{name}"}} {stats["sum"]:.6f}')
+            lines.append(f'intraday_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+        peaks = {name: stats['peak_bytes'] for name, stats in snapshot['stages'].items() if 'peak_bytes' in stats}
+        if peaks:
+            lines += ['# TYPE intraday_stage_peak_bytes gauge'] + [f'intraday_stage_peak_bytes{{stage="{name}"}} {peak}' for name, peak in sorted(peaks.items())]
+        if snapshot['counters']:
+            lines.append('# TYPE intraday_events_total counter')
+            lines += [f'intraday_events_total{{event="{name}"}} {n}' for name, n in sorted(snapshot['counters'].items())]
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """Write path + '.json' and path + '.prom' (atomically, for a node-exporter textfile collector)"""
+        snapshot = self.snapshot()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        for suffix, text in (('.json', json.dumps(snapshot, indent=2)), ('.prom', self.prometheus(snapshot))):
+            tmp = f'{path}{suffix}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(text)
+            os.replace(tmp, path + suffix)
+
+RECORDER = Recorder()
+stage = RECORDER.stage
+configure = RECORDER.configure
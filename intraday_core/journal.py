@@ -0,0 +1,209 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Journal columns as shown on the Logs page
+DISPLAY_COLUMNS = {
+    'time': 'Time', 'hour': 'Hour', 'trigger': 'Trigger', 'exec_plan': 'EXEC PLAN',
+    'fence': 'FENCE', 'status': 'Status', 'pnl_k': 'P&L €k', 'notes': 'Notes',
+}
+
+# "148MW €47P/€54C collar" -> MW, put strike, call strike
+FENCE_PATTERN = re.compile(r'(\d+)\s*MW\s*€?([\d.]+)P\s*/\s*€?([\d.]+)C')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL, trading_day TEXT NOT NULL, hour TEXT, trigger TEXT, exec_plan TEXT,
+    fence TEXT, status TEXT, pnl_k REAL, notes TEXT, fence_mw INTEGER, fence_put REAL, fence_call REAL
+);
+CREATE INDEX IF NOT EXISTS executions_day ON executions (trading_day, id);
+CREATE INDEX IF NOT EXISTS executions_day_hour ON executions (trading_day, hour, id);
+CREATE INDEX IF NOT EXISTS executions_day_trigger ON executions (trading_day, trigger, id);
+CREATE TABLE IF NOT EXISTS execution_totals (
+    trading_day TEXT NOT NULL, hour TEXT NOT NULL, trigger TEXT NOT NULL,
+    count INTEGER NOT NULL, pnl_sum REAL NOT NULL, fence_mw_sum REAL NOT NULL, fence_count INTEGER NOT NULL,
+    pnl_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (trading_day, hour, trigger)
+);
+"""
+
+# Running aggregates per (day, hour, trigger), maintained in the same transaction as each insert; P&L and fence
+# averages are over the rows that carry them (limit BREACH/CLEAR rows have neither)
+_TOTALS_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS executions_totals AFTER INSERT ON executions BEGIN
+    INSERT INTO execution_totals (trading_day, hour, trigger, count, pnl_sum, fence_mw_sum, fence_count, pnl_count) VALUES (
+        NEW.trading_day, COALESCE(NEW.hour, ''), COALESCE(NEW.trigger, ''),
+        1, COALESCE(NEW.pnl_k, 0), COALESCE(NEW.fence_mw, 0), NEW.fence_mw IS NOT NULL, NEW.pnl_k IS NOT NULL)
+    ON CONFLICT (trading_day, hour, trigger) DO UPDATE SET
+        count = count + 1, pnl_sum = pnl_sum + excluded.pnl_sum, pnl_count = pnl_count + excluded.pnl_count,
+        fence_mw_sum = fence_mw_sum + excluded.fence_mw_sum, fence_count = fence_count + excluded.fence_count;
+END;
+"""
+
+TOTALS_COLUMNS = ['count', 'pnl_sum', 'pnl_count', 'fence_mw_sum', 'fence_count']
+
+def parse_fence(fence):
+    match = FENCE_PATTERN.search(fence or '')
+    return (int(match[1]), float(match[2]), float(match[3])) if match else (None, None, None)
+
+def summarize(totals, hour=None, trigger=None):
+    """Count, average P&L and average fence MW from a totals frame, optionally for one hour and/or trigger"""
+    for level, value in (('hour', hour), ('trigger', trigger)):
+        if value is not None:
+            totals = totals[totals.index.get_level_values(level) == value]
+    count, pnl_sum, pnl_count, fence_mw_sum, fence_count = (totals[column].sum() for column in TOTALS_COLUMNS)
+    return {'count': int(count), 'avg_pnl': pnl_sum / pnl_count if pnl_count else 0, 'avg_fence': fence_mw_sum / fence_count if fence_count else 0}
+
+def since(totals, baseline):
+    """Totals accumulated after a checkpoint; groups with nothing new are dropped"""
+    if baseline is None: return totals
+    delta = totals.sub(baseline, fill_value=0)
+    return delta[delta['count'] > 0]
+
+def active_values(totals, level):
+    return sorted(value for value in totals.index.unique(level) if value)
+
+def demo_entry(rng=np.random):
+    """Random execution in the display format Journal.append takes"""
+    return {
+        'Hour': f'H{rng.randint(1,25)}',
+        'Trigger': rng.choice(['MOM+1.2🔵', 'LOB60🔴', 'IMB82%', 'VAR120k', 'SHAPE-0.8']),
+        'EXEC PLAN': rng.choice([
+            "2×BLOCK + 2×LARGE CLIP + 1×ICEBERG + 1×LADDER",
+            "3×BLOCK + 1×CLIP + 2×ICEBERG",
+            "1×BLOCK + 3×LARGE CLIP + 2×LADDER"
+        ]),
+        'FENCE': f"{rng.randint(120,220)}MW €{rng.randint(45,50)}P/€{rng.randint(52,56)}C collar",
+        'Status': rng.choice(['✅ EXEC', '⏳ PENDING']),
+        'P&L €k': rng.randint(-30, 80),
+        'Notes': rng.choice(['Full fill', 'Partial 80%', 'Low slippage'])
+    }
+
+class Journal:
+    """Append-only execution journal in SQLite (WAL), shared by every session and surviving restarts.
+
+    Appends are buffered and written in one transaction per batch; reads are paged so a session never
+    loads a full trading day.
+    """
+
+    def __init__(self, path, batch_size=200, flush_seconds=1.0, retention_days=30):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self._pending = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._retained_day = None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+            self._migrate(conn)
+            conn.executescript(_TOTALS_TRIGGER)
+        self.apply_retention()
+
+    @staticmethod
+    def _migrate(conn):
+        # Journals written before the structured fence fields or the P&L row count: add and backfill them, then
+        # reseed the totals (and the trigger that maintains them) from the executions
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(executions)")}
+        totals_columns = {row[1] for row in conn.execute("PRAGMA table_info(execution_totals)")}
+        if 'fence_mw' in columns and 'pnl_count' in totals_columns: return
+        if 'fence_mw' not in columns:
+            for column, kind in (('fence_mw', 'INTEGER'), ('fence_put', 'REAL'), ('fence_call', 'REAL')):
+                conn.execute(f"ALTER TABLE executions ADD COLUMN {column} {kind}")
+            rows = conn.execute("SELECT id, fence FROM executions").fetchall()
+            conn.executemany("UPDATE executions SET fence_mw = ?, fence_put = ?, fence_call = ? WHERE id = ?",
+                             [(*parse_fence(fence), row_id) for row_id, fence in rows])
+        if 'pnl_count' not in totals_columns:
+            conn.execute("ALTER TABLE execution_totals ADD COLUMN pnl_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("DROP TRIGGER IF EXISTS executions_totals")
+        conn.execute("DELETE FROM execution_totals")
+        conn.execute(
+            "INSERT INTO execution_totals (trading_day, hour, trigger, count, pnl_sum, fence_mw_sum, fence_count, pnl_count) "
+            "SELECT trading_day, COALESCE(hour, ''), COALESCE(trigger, ''), COUNT(*), COALESCE(SUM(pnl_k), 0), "
+            "COALESCE(SUM(fence_mw), 0), COUNT(fence_mw), COUNT(pnl_k) FROM executions GROUP BY 1, 2, 3")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def append(self, entry, ts=None):
+        """Queue one execution (keyed by the display column names); written on the next batch flush"""
+        ts = ts or datetime.now()
+        # Fence parsed once here so KPIs never re-extract it from the text
+        row = (ts.isoformat(timespec='seconds'), ts.date().isoformat(), entry.get('Hour'), entry.get('Trigger'),
+               entry.get('EXEC PLAN'), entry.get('FENCE'), entry.get('Status'), entry.get('P&L €k'), entry.get('Notes'),
+               *parse_fence(entry.get('FENCE')))
+        with self._lock:
+            self._pending.append(row)
+            due = len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+        if not rows: return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO executions (ts, trading_day, hour, trigger, exec_plan, fence, status, pnl_k, notes, "
+                "fence_mw, fence_put, fence_call) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        # Retention runs once per trading day
+        if self._retained_day != rows[-1][1]:
+            self.apply_retention()
+
+    def apply_retention(self):
+        cutoff = (datetime.now().date() - timedelta(days=self.retention_days)).isoformat()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM executions WHERE trading_day < ?", (cutoff,))
+            conn.execute("DELETE FROM execution_totals WHERE trading_day < ?", (cutoff,))
+        self._retained_day = datetime.now().date().isoformat()
+
+    def _where(self, day, hour, trigger, after_id):
+        clauses, params = ["trading_day = ?", "id > ?"], [(day or datetime.now().date()).isoformat(), after_id]
+        for column, value in (('hour', hour), ('trigger', trigger)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def read_page(self, page=0, page_size=100, day=None, hour=None, trigger=None, after_id=0):
+        """Newest-first page of one trading day, optionally for one delivery hour and/or trigger (both indexed)"""
+        where, params = self._where(day, hour, trigger, after_id)
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(
+                f"SELECT id, substr(ts, 12, 8) AS time, hour, trigger, exec_plan, fence, status, pnl_k, notes "
+                f"FROM executions WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                conn, params=params + [page_size, page * page_size])
+        return df.set_index('id').rename(columns=DISPLAY_COLUMNS)
+
+    def totals(self, day=None):
+        """Running (count, P&L sum and count, fence MW sum and count) per (hour, trigger) for a trading day; size is independent of the journal length"""
+        with closing(self._connect()) as conn:
+            df = pd.read_sql_query(
+                "SELECT hour, trigger, count, pnl_sum, pnl_count, fence_mw_sum, fence_count FROM execution_totals WHERE trading_day = ?",
+                conn, params=[(day or datetime.now().date()).isoformat()])
+        return df.set_index(['hour', 'trigger'])
+
+    def checkpoint(self, day=None):
+        """(last id, totals) read in one transaction, so later totals can be diffed against it"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN")
+            last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM executions").fetchone()[0]
+            df = pd.read_sql_query(
+                "SELECT hour, trigger, count, pnl_sum, pnl_count, fence_mw_sum, fence_count FROM execution_totals WHERE trading_day = ?",
+                conn, params=[(day or datetime.now().date()).isoformat()])
+        return last, df.set_index(['hour', 'trigger'])
+
+    def last_id(self):
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM executions").fetchone()[0]
@@ -0,0 +1,75 @@
+from collections import namedtuple
+from datetime import datetime
+import numpy as np
+
+# A limit breaches once its value stays above trigger for debounce ticks, and clears once it stays below
+# release for debounce ticks; per_period limits hold one value per blotter row and breach as a whole while any
+# of their periods does
+Limit = namedtuple('Limit', ['name', 'trigger', 'release', 'debounce', 'per_period'], defaults=[1, False])
+LimitEvent = namedtuple('LimitEvent', ['time', 'limit', 'period', 'breached', 'value', 'trigger', 'release'])
+
+class LimitEngine:
+    """Every portfolio and per-period limit as one flat vector, updated with one array operation per tick.
+
+    update() returns only the state transitions as LimitEvents, so consumers (the fence, the execution
+    journal) react to a breach once instead of to every tick it lasts. A per-period limit reports one event when
+    its first period breaches and one when its last period clears (period lists the periods that flipped);
+    the rows flipping in between only show in active().
+    """
+
+    def __init__(self, limits, labels=()):
+        self.limits = list(limits)
+        sizes = [len(labels) if limit.per_period else 1 for limit in self.limits]
+        bounds = np.cumsum([0] + sizes)
+        self._slices = {limit.name: slice(lo, hi) for limit, lo, hi in zip(self.limits, bounds[:-1], bounds[1:])}
+        self._sizes = dict(zip((limit.name for limit in self.limits), sizes))
+        self._per_period = {limit.name: limit.per_period for limit in self.limits}
+        self.trigger = np.repeat([float(limit.trigger) for limit in self.limits], sizes)
+        self.release = np.repeat([float(limit.release) for limit in self.limits], sizes)
+        self.debounce = np.repeat([limit.debounce for limit in self.limits], sizes)
+        self.names = np.repeat([limit.name for limit in self.limits], sizes)
+        self.periods = np.concatenate([np.asarray(labels, dtype=object) if limit.per_period else np.array([None]) for limit in self.limits])
+        self.state = np.zeros(len(self.trigger), dtype=bool)
+        self._streak = np.zeros(len(self.trigger), dtype=np.int32)
+
+    @classmethod
+    def from_config(cls, config, labels=()):
+        """Engine from {name: {'trigger', 'release', 'debounce', 'per_period'}} (config.LIMITS)"""
+        return cls([Limit(name, **spec) for name, spec in config.items()], labels)
+
+    def update(self, values, timestamp=None):
+        """Feed one tick of {limit name: value or per-period array}; returns the LimitEvents of limits that flipped"""
+        x = np.concatenate([np.broadcast_to(np.asarray(values[name], dtype=float), (self._sizes[name],)) for name in self._slices])
+        # Counting ticks spent on the far side of the band; NaN never crosses
+        crossing = np.where(self.state, x < self.release, x > self.trigger)
+        self._streak = np.where(crossing, self._streak + 1, 0)
+        flip = self._streak >= self.debounce
+        before = self.state.copy()
+        self.state ^= flip
+        self._streak[flip] = 0
+        timestamp = timestamp or datetime.now()
+        events = []
+        for limit in self.limits:
+            part = self._slices[limit.name]
+            flipped = np.flatnonzero(flip[part])
+            if not len(flipped) or (limit.per_period and before[part].any() == self.state[part].any()):
+                continue
+            i = part.start + flipped[np.argmax(x[part][flipped])]
+            period = ', '.join(self.periods[part][flipped]) if limit.per_period else None
+            events.append(LimitEvent(timestamp, limit.name, period, bool(self.state[i]), float(x[i]), self.trigger[i], self.release[i]))
+        return events
+
+    def active(self, name):
+        """Breach state of a limit: a bool, or one per period for per-period limits"""
+        state = self.state[self._slices[name]]
+        return state.copy() if self._per_period[name] else bool(state[0])
+
+def journal_entry(event):
+    """A LimitEvent in the display format journal.Journal.append takes"""
+    return {
+        'Hour': event.period or 'PTF',
+        'Trigger': f"{event.limit.upper()}{'>' if event.breached else '<'}{event.trigger if event.breached else event.release:g}{'🔴' if event.breached else '🟢'}",
+        'EXEC PLAN': 'LIMIT BREACH' if event.breached else 'LIMIT CLEAR',
+        'Status': '🚨 BREACH' if event.breached else '✅ CLEAR',
+        'Notes': f"{event.limit} {event.value:.1f} (trigger {event.trigger:g}, release {event.release:g})",
+    }
@@ -0,0 +1,111 @@
+import numpy as np
+from config import LIMITS
+from . import feed, instrument, positions
+from .blotter import BLOTTER_COLUMNS, BLOTTER_LABELS, PRODUCT_HOURS, build_blotter, draw_tick_inputs, residuals
+
+# Scalar draws of one tick next to the per-row arrays of blotter.draw_tick_inputs
+SCALAR_DRAWS = {
+    'pnl': (50, 120), 'pos': (-10, 10), 'imb': (-7, 7), 'shape': (-10, 20), 'momentum': (-10, 20),
+    'leer': (10, 20), 'ladder': (10, 20), 'iceberg': (10, 20), 'bess': (-10, 10), 'wind': (-10, 10), 'solar': (-10, 10),
+}
+
+# Chance that a working blotter row fills on a tick, when the tick keeps a positions.PositionBook
+FILL_PROBABILITY = 0.1
+
+def get_ptf_vol(rng=np.random):
+    return rng.uniform(3, 7)
+
+def draw_tick(rng=np.random, book=None):
+    """Every input of one tick, so a tick can be recorded and replayed (see sources).
+
+    With a feed.OrderBook snapshot the LOB depth, imbalance and ID bid/offer come from the book instead of draws.
+    """
+    draws = draw_tick_inputs(len(BLOTTER_LABELS), rng)
+    draws.update({name: rng.randint(*bounds) for name, bounds in SCALAR_DRAWS.items()})
+    draws.update(fallback_ptf_var=rng.uniform(35, 105), fallback_ptf_vol=get_ptf_vol(rng), atr=round(rng.uniform(50, 60), 2))
+    draws.update(fill_draw=rng.uniform(size=len(BLOTTER_LABELS)), fill_asset=rng.randint(0, len(positions.ASSETS), len(BLOTTER_LABELS)))
+    return draws if book is None else feed.book_inputs(draws, book, BLOTTER_COLUMNS)
+
+def portfolio_risk(model, inputs, period, hours):
+    """(VaR €k, vol €/MWh) of the residuals across all hourly and quarter-hour products, or stand-ins without price history.
+
+    period maps each product to a model period (stats.PriceStats.position), -1 for products without history; hours
+    is each product's delivery length (blotter.PRODUCT_HOURS), so positions are valued as MWh. An hour's price
+    is the mean of its quarters', so an hourly position and its quarter-hour hedges offset through the scenarios.
+    """
+    if model is None:
+        return inputs['fallback_ptf_var'], inputs['fallback_ptf_vol']
+    energy = residuals(inputs) * hours
+    positions = np.bincount(period[period >= 0], weights=energy[period >= 0], minlength=len(model.periods))
+    result = model.portfolio(positions)
+    return result['hist_var'] / 1000, result['vol']
+
+def breaches(ptf_var, imb, ptf_vol, limit_engine=None, inputs=None):
+    """(VaR, imbalance, vol) breach flags and the limit events of this tick.
+
+    Any breach raises the fence (every row switches to the collar). Without a limits.LimitEngine these are plain
+    checks against the config.LIMITS triggers; with one (portfolio limits 'VaR', 'Imb', 'Vol', plus any
+    per-period limit on 'Residual') they carry hysteresis and debounce across ticks.
+    """
+    if limit_engine is None:
+        return ptf_var > LIMITS['VaR']['trigger'], abs(imb) > LIMITS['Imb']['trigger'], ptf_vol > LIMITS['Vol']['trigger'], []
+    values = {'VaR': ptf_var, 'Imb': abs(imb), 'Vol': ptf_vol, 'Residual': np.abs(residuals(inputs))}
+    events = limit_engine.update({limit.name: values[limit.name] for limit in limit_engine.limits})
+    return limit_engine.active('VaR'), limit_engine.active('Imb'), limit_engine.active('Vol'), events
+
+def open_book(book, inputs, price_stats):
+    # The day's PPA and DA positions, booked once at the last DA price of each product
+    da = price_stats.take(price_stats.last, BLOTTER_COLUMNS)
+    da = np.where(np.isnan(da), inputs['fallback_da'], da)
+    book.fill(inputs['fill_asset'], positions.PPA, BLOTTER_COLUMNS, inputs['ppa_pos'], da)
+    book.fill(inputs['fill_asset'], positions.DA, BLOTTER_COLUMNS, inputs['da_pos'], da)
+
+def book_fills(book, blotter, inputs):
+    """Fill a random share of the working rows at their bid/offer, then mark every product to its mid"""
+    codes = blotter['Strategy'].cat.codes.to_numpy()
+    size = blotter['Size'].to_numpy(dtype=float)
+    filled = (codes > 0) & (inputs['fill_draw'] < FILL_PROBABILITY)
+    price = np.where(size > 0, blotter['ID Offer€'].to_numpy(), blotter['ID Bid€'].to_numpy())
+    book.fill(inputs['fill_asset'][filled], positions.strategy_book(codes[filled]), BLOTTER_COLUMNS[filled], size[filled], price[filled])
+    book.mark_to_market(blotter['Mid€'].to_numpy(), BLOTTER_COLUMNS)
+
+def summary(inputs, book=None):
+    """PTF P&L (€k), net MW and their strategy/asset splits from the position book, or the scalar stand-ins without one"""
+    if book is None:
+        market = inputs['pnl'] - inputs['shape'] - inputs['leer'] - inputs['ladder'] - inputs['iceberg'] - inputs['momentum']
+        return {**{name: inputs[name] for name in SCALAR_DRAWS}, 'market': market, 'hydro': inputs['pos'] - inputs['bess'] - inputs['wind'] - inputs['solar']}
+    pnl = {name: round(value / 1000) for name, value in book.pnl_by_book().items()}
+    mw = {name.lower(): round(value) for name, value in book.position_by_asset().items()}
+    # The portfolio imbalance is not a book quantity and stays the tick's draw
+    return {'pnl': round(book.pnl() / 1000), 'pos': round(book.net_position().sum()), 'imb': inputs['imb'], 'market': pnl['Market'],
+            'leer': pnl['Leer'], 'ladder': pnl['Ladder'], 'iceberg': pnl['Iceberg'], **mw}
+
+def compute_tick(price_stats, model=None, draws=None, rng=np.random, position_book=None, limit_engine=None):
+    """One dashboard tick from the product price history (blotter.product_history) as stats.PriceStats, its risk.RiskModel and draw_tick().
+
+    With a positions.PositionBook the residuals and the PTF summary come from the book, and the tick's fills go into it.
+    With a limits.LimitEngine the breach flags are debounced and the tick carries the limit transitions as 'events'.
+    """
+    with instrument.stage('overview.inputs'):
+        inputs = draw_tick(rng) if draws is None else draws
+    book = position_book
+    if book is not None:
+        if not book.fills: open_book(book, inputs, price_stats)
+        ppa_pos, id_pos, da_pos = book.residuals(BLOTTER_COLUMNS)
+        inputs = {**inputs, 'ppa_pos': ppa_pos, 'id_pos': id_pos, 'da_pos': da_pos}
+    with instrument.stage('overview.risk'):
+        ptf_var, ptf_vol = portfolio_risk(model, inputs, price_stats.position(BLOTTER_COLUMNS), PRODUCT_HOURS[BLOTTER_COLUMNS])
+    with instrument.stage('overview.limits'):
+        var_breach, imb_breach, vol_breach, events = breaches(ptf_var, inputs['imb'], ptf_vol, limit_engine, inputs)
+    fence_active = var_breach or imb_breach or vol_breach
+    with instrument.stage('overview.blotter'):
+        blotter = build_blotter(inputs, BLOTTER_LABELS, BLOTTER_COLUMNS, fence_active, price_stats, model)
+    if book is not None:
+        with instrument.stage('overview.positions'):
+            book_fills(book, blotter, inputs)
+    return {
+        'prices_loaded': not price_stats.empty,
+        'ptf_var': ptf_var, 'ptf_vol': ptf_vol, 'var_breach': var_breach, 'imb_breach': imb_breach, 'vol_breach': vol_breach,
+        **summary(inputs, book), 'atr': inputs['atr'],
+        'blotter': blotter, 'events': events,
+    }
@@ -0,0 +1,81 @@
+import numpy as np
+from .blotter import STRATEGIES
+
+ASSETS = ['BESS', 'WIND', 'SOLAR', 'HYDRO']
+# PPA and day-ahead positions, then one book per ID strategy
+BOOKS = ['PPA', 'DA', *STRATEGIES[1:]]
+PPA, DA = 0, 1
+
+def strategy_book(codes):
+    """Book index of blotter strategy codes (positions of STRATEGIES)"""
+    return np.asarray(codes) + DA
+
+class PositionBook:
+    """Fills aggregated per (asset, book, delivery period) into net MW and cash arrays, marked to the latest mid.
+
+    Besides the full (assets, books, periods) arrays the book keeps the per-book and per-asset marginals, so a
+    fill is a few scatter-adds and P&L, residuals and attribution are reductions over periods, whatever the
+    number of fills. hours is the delivery length of each period (1 for hourly, 0.25 for quarter-hour products).
+    """
+
+    def __init__(self, periods, hours=1.0, assets=ASSETS, books=BOOKS):
+        self.assets = list(assets)
+        self.books = list(books)
+        self.hours = np.broadcast_to(np.asarray(hours, dtype=float), (periods,)).copy()
+        self.position = np.zeros((len(self.assets), len(self.books), periods))
+        self.cash = np.zeros((len(self.assets), len(self.books), periods))
+        self.book_position = np.zeros((len(self.books), periods))
+        self.asset_position = np.zeros((len(self.assets), periods))
+        self.book_cash = np.zeros(len(self.books))
+        self.asset_cash = np.zeros(len(self.assets))
+        self.mark = np.full(periods, np.nan)
+        self.fills = 0
+
+    def fill(self, asset, book, period, mw, price):
+        """Book one or many fills (arrays broadcast together); positive MW buys. NaN sizes are skipped."""
+        asset, book, period, mw, price = np.broadcast_arrays(asset, book, period, np.asarray(mw, dtype=float), np.asarray(price, dtype=float))
+        ok = ~(np.isnan(mw) | np.isnan(price)) & (mw != 0)
+        asset, book, period, mw, price = asset[ok], book[ok], period[ok], mw[ok], price[ok]
+        cash = -mw * price * self.hours[period]
+        np.add.at(self.position, (asset, book, period), mw)
+        np.add.at(self.cash, (asset, book, period), cash)
+        np.add.at(self.book_position, (book, period), mw)
+        np.add.at(self.asset_position, (asset, period), mw)
+        self.book_cash += np.bincount(book, weights=cash, minlength=len(self.books))
+        self.asset_cash += np.bincount(asset, weights=cash, minlength=len(self.assets))
+        # A period is marked at its first fill until a mid arrives
+        unmarked = np.isnan(self.mark[period])
+        self.mark[period[unmarked]] = price[unmarked]
+        self.fills += len(mw)
+
+    def mark_to_market(self, mid, period=None):
+        """Latest mid per period (or for the given periods); NaN leaves the previous mark"""
+        mid = np.asarray(mid, dtype=float)
+        period = np.arange(len(self.mark)) if period is None else np.asarray(period)
+        live = ~np.isnan(mid)
+        self.mark[period[live]] = mid[live]
+
+    def _value(self, positions):
+        # MW × €/MWh × delivery hours at the current marks, summed over periods
+        return positions @ (np.nan_to_num(self.mark) * self.hours)
+
+    def pnl(self):
+        return self._value(self.book_position.sum(axis=0)) + self.book_cash.sum()
+
+    def pnl_by_book(self):
+        return dict(zip(self.books, self._value(self.book_position) + self.book_cash))
+
+    def pnl_by_asset(self):
+        return dict(zip(self.assets, self._value(self.asset_position) + self.asset_cash))
+
+    def net_position(self):
+        """Residual MW per period across every asset and book"""
+        return self.book_position.sum(axis=0)
+
+    def position_by_asset(self):
+        return dict(zip(self.assets, self.asset_position.sum(axis=1)))
+
+    def residuals(self, period=None):
+        """(PPA, ID, DA) MW per period, the three parts of the blotter's residual"""
+        period = slice(None) if period is None else period
+        return self.book_position[PPA, period], self.book_position[DA + 1:, period].sum(axis=0), self.book_position[DA, period]
@@ -0,0 +1,156 @@
+import abc
+import functools
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+import numpy as np
+
+# Recording layout: MAGIC, then one frame per tick:
+#   <I frame length> <d unix time> <H stream name length> stream name, then the payload:
+#   <I header length> JSON header (scalars and strings as-is, arrays as dtype/shape/offset) + raw array bytes
+MAGIC = b'IDTICKS1'
+_FRAME = struct.Struct('<IdH')
+_HEADER = struct.Struct('<I')
+
+def encode(data):
+    """Flat dict of scalars, strings and NumPy arrays as compact bytes"""
+    header, arrays, chunks, offset = {}, {}, [], 0
+    for key, value in data.items():
+        if isinstance(value, np.ndarray):
+            raw = np.ascontiguousarray(value).tobytes()
+            arrays[key] = [value.dtype.str, list(value.shape), offset]
+            chunks.append(raw)
+            offset += len(raw)
+        else:
+            header[key] = value.item() if isinstance(value, np.generic) else value
+    text = json.dumps({'values': header, 'arrays': arrays}, ensure_ascii=False).encode()
+    return _HEADER.pack(len(text)) + text + b''.join(chunks)
+
+def decode(payload):
+    (size,) = _HEADER.unpack_from(payload)
+    header = json.loads(payload[_HEADER.size:_HEADER.size + size])
+    body = memoryview(payload)[_HEADER.size + size:]
+    data = dict(header['values'])
+    for key, (dtype, shape, offset) in header['arrays'].items():
+        dtype = np.dtype(dtype)
+        data[key] = np.frombuffer(body, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    return data
+
+def read_recording(path):
+    """(stream, timestamp, data) for every tick in a recording, in the order they were written"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a tick recording")
+        while head := f.read(_FRAME.size):
+            length, timestamp, name_length = _FRAME.unpack(head)
+            frame = f.read(length)
+            yield frame[:name_length].decode(), timestamp, decode(frame[name_length:])
+
+class TickSource(abc.ABC):
+    """Where the random inputs of each producer tick come from.
+
+    next(stream, draw) returns the inputs for one tick of a stream ('overview', 'shape', ...); draw(rng) is how
+    that stream makes fresh ones. interval(stream, default) is the tick interval the producer should use.
+    """
+
+    @abc.abstractmethod
+    def next(self, stream, draw):
+        """Inputs for the next tick of stream"""
+
+    def interval(self, stream, default):
+        return default
+
+class RandomSource(TickSource):
+    """Fresh draws; with a seed every stream gets its own RandomState, so a run is reproducible per stream"""
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._rngs = {}
+
+    def rng(self, stream):
+        if self.seed is None: return np.random
+        if stream not in self._rngs:
+            self._rngs[stream] = np.random.RandomState([self.seed, zlib.crc32(stream.encode())])
+        return self._rngs[stream]
+
+    def next(self, stream, draw):
+        return draw(self.rng(stream))
+
+class RecordingSource(TickSource):
+    """Passes another source through and appends every tick it hands out to a binary recording"""
+
+    def __init__(self, path, source=None):
+        self.source = source or RandomSource()
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+
+    def next(self, stream, draw):
+        data = self.source.next(stream, draw)
+        name, payload = stream.encode(), encode(data)
+        with self._lock:
+            self._file.write(_FRAME.pack(len(name) + len(payload), time.time(), len(name)) + name + payload)
+            self._file.flush()
+        return data
+
+    def interval(self, stream, default):
+        return self.source.interval(stream, default)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class ReplaySource(TickSource):
+    """Streams a recording back, each stream at its recorded cadence divided by speed (1× to 100× and beyond).
+
+    At the end of a stream it starts over when loop is set; streams missing from the recording get fresh draws.
+    """
+
+    def __init__(self, path, speed=1.0, loop=True, fallback=None):
+        if speed <= 0: raise ValueError("speed must be positive")
+        self.speed = speed
+        self.loop = loop
+        self.fallback = fallback or RandomSource()
+        self._ticks = defaultdict(list)
+        self._times = defaultdict(list)
+        for stream, timestamp, data in read_recording(path):
+            self._ticks[stream].append(data)
+            self._times[stream].append(timestamp)
+        self._position = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(ticks) for ticks in self._ticks.values())
+
+    def next(self, stream, draw):
+        ticks = self._ticks.get(stream)
+        if not ticks: return self.fallback.next(stream, draw)
+        with self._lock:
+            position = self._position[stream]
+            if position >= len(ticks):
+                if not self.loop: raise StopIteration(f"recording of {stream!r} exhausted")
+                position = 0
+            self._position[stream] = position + 1
+        return ticks[position]
+
+    def interval(self, stream, default):
+        times = self._times.get(stream, [])
+        recorded = float(np.median(np.diff(times))) if len(times) > 1 else default
+        return recorded / self.speed
+
+@functools.lru_cache(maxsize=None)
+def open_source(mode='random', seed=None, path=None, speed=1.0):
+    """One source per configuration per process, shared by every page ('random', 'record' or 'replay')"""
+    if mode == 'random':
+        return RandomSource(seed)
+    if mode == 'record':
+        return RecordingSource(path, RandomSource(seed))
+    if mode == 'replay':
+        return ReplaySource(path, speed, fallback=RandomSource(seed))
+    raise ValueError(f"Unknown tick source mode {mode!r}")
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (5, 25, 50, 75, 95)
+EWMA_LAMBDA = 0.94
+
+class PriceStats:
+    """Per-period statistics of a day × delivery period price history, as NumPy vectors over the periods.
+
+    Built once per price load; the tick path maps its products to periods once (position) and then only
+    indexes into these vectors. Count, mean, std and percentiles are over the daily prices, the EWMA vol over
+    day-over-day changes (RiskMetrics weights, gaps skipped), last is the latest published price.
+    """
+
+    def __init__(self, prices, ewma_lambda=EWMA_LAMBDA):
+        self.periods = np.asarray(prices.columns)
+        self._index = pd.Index(self.periods)
+        values = prices.to_numpy(dtype=float).reshape(len(prices), len(self.periods))
+        valid = ~np.isnan(values)
+        self.count = valid.sum(axis=0)
+        self.known = self.count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(self.known, np.nansum(values, axis=0) / np.maximum(self.count, 1), np.nan)
+            self.std = np.where(self.count > 1, np.sqrt(np.nansum((values - self.mean) ** 2, axis=0) / np.maximum(self.count - 1, 1)), np.nan)
+        self.percentiles = np.full((len(PERCENTILES), len(self.periods)), np.nan)
+        if self.known.any():
+            self.percentiles[:, self.known] = np.nanpercentile(values[:, self.known], PERCENTILES, axis=0)
+        self.last = prices.ffill().iloc[-1].to_numpy(dtype=float) if len(prices) else np.full(len(self.periods), np.nan)
+        self.ewma_vol = self._ewma_vol(values, ewma_lambda)
+        self._position = (None, None)
+
+    @staticmethod
+    def _ewma_vol(values, ewma_lambda):
+        changes = np.diff(values, axis=0)
+        if not len(changes): return np.full(values.shape[1], np.nan)
+        weights = ewma_lambda ** np.arange(len(changes) - 1, -1, -1)[:, None] * ~np.isnan(changes)
+        total = weights.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, np.sqrt(np.nansum(weights * changes ** 2, axis=0) / total), np.nan)
+
+    def __len__(self):
+        return len(self.periods)
+
+    @property
+    def empty(self):
+        return not self.known.any()
+
+    def percentile(self, q):
+        return self.percentiles[PERCENTILES.index(q)]
+
+    def position(self, col_idx):
+        """Index of each product into the period vectors (-1 when not in the history); cached on col_idx"""
+        key = np.asarray(col_idx).tobytes()
+        if self._position[0] != key:
+            self._position = (key, self._index.get_indexer(col_idx))
+        return self._position[1]
+
+    def take(self, values, col_idx):
+        """A per-period vector (e.g. self.last) per product, NaN for products without history"""
+        period = self.position(col_idx)
+        if not len(self.periods): return np.full(len(period), np.nan)
+        return np.where(period >= 0, values[period], np.nan)
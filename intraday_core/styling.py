@@ -0,0 +1,41 @@
+import functools
+import numpy as np
+from .blotter import STRATEGIES
+
+# Display formats applied by style_dataframe; the blotter itself stays numeric
+BLOTTER_FORMAT = {
+    'DA€': '{:.2f}', 'ID Bid€': '{:.2f}', 'Bid MW': '{}MW', 'ID Offer€': '{:.2f}', 'Offer MW': '{}MW',
+    'Mid€': '{:.2f}', 'Shape': lambda v: f"{v:+.2f}{'🟢' if abs(v) > 1.0 else ''}", 'Var': '€{:.1f}k',
+    'Imb': '{:+.1f}MW', 'Vol': '€{:.2f}', 'LOB': '{}', 'Residual': '{} MW', 'Size': '{:+.0f}MW',
+    'Put€': '€{:.0f}P', 'Call€': '€{:.0f}C',
+}
+
+BLINK_RED = 'color: red; font-weight: bold; animation: blinker 1s linear infinite;'
+BLINK_YELLOW = 'color: yellow; font-weight: bold; animation: blinker 1s linear infinite;'
+BLINK_GREEN = 'color: green; font-weight: bold; animation: blinker 1s linear infinite;'
+
+# Cells that blink for each strategy
+STRATEGY_CSS = {
+    'Iceberg': {'Imb': BLINK_YELLOW, 'LOB': BLINK_YELLOW},
+    'Ladder': {'LOB': BLINK_GREEN},
+    'Market': {'LOB': BLINK_RED},
+}
+
+@functools.lru_cache(maxsize=32)
+def _blotter_css(strategy_codes, columns):
+    # Whole CSS matrix from one mask per strategy; keyed on the strategy vector so an unchanged layout is reused
+    codes = np.frombuffer(strategy_codes, dtype=np.int8)
+    css = np.full((len(codes), len(columns)), '', dtype=object)
+    for strategy, rules in STRATEGY_CSS.items():
+        mask = codes == STRATEGIES.index(strategy)
+        for col, style in rules.items():
+            if col in columns:
+                css[mask, columns.index(col)] = style
+    css.flags.writeable = False
+    return css
+
+def style_dataframe(styler):
+    styler.format(BLOTTER_FORMAT, na_rep='')
+    codes = styler.data['Strategy'].cat.codes.to_numpy(dtype=np.int8)
+    styler.apply(lambda _: _blotter_css(codes.tobytes(), tuple(styler.data.columns)), axis=None)
+    return styler
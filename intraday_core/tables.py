@@ -0,0 +1,42 @@
+import threading
+from . import instrument
+
+def pin(styler):
+    """Compute a Styler's cell styles and translated table once, so emitting it again skips both.
+
+    st.dataframe runs the private Styler._compute() and _translate() on every call; pinning them to their first
+    result leaves only Streamlit's display-value and Arrow conversion per emission. A pinned Styler must not be
+    restyled. A pandas without those methods gets the Styler back unpinned, restyled on every emission as before.
+    """
+    if not (callable(getattr(styler, '_compute', None)) and callable(getattr(styler, '_translate', None))):
+        return styler
+    styler._compute()
+    translated = styler._translate(False, False)
+    styler._compute = lambda: styler
+    styler._translate = lambda *args, **kwargs: translated
+    return styler
+
+class TableRender:
+    """One table's pinned Styler for the latest producer version, shared by every session of the process.
+
+    The first session to ask for a new version styles the frame; every other session, and every rerun before the
+    next tick, re-emits the same object. Its fixed uuid keeps the message byte-identical, so Streamlit sends a
+    hash reference instead of the table to a browser that already has it.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.uuid = name.replace('.', '_')
+        self._lock = threading.Lock()
+        self._version = self._styler = None
+
+    def render(self, version, frame, style):
+        """style(frame) pinned, restyled only when version differs from the last call"""
+        with self._lock:
+            if self._styler is None or version != self._version:
+                self._styler = pin(style(frame).set_uuid(self.uuid))
+                self._version = version
+                instrument.RECORDER.count(f'{self.name}.styled')
+            else:
+                instrument.RECORDER.count(f'{self.name}.reused')
+            return self._styler
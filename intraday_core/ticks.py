@@ -0,0 +1,66 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from . import instrument
+
+logger = logging.getLogger(__name__)
+
+Snapshot = namedtuple('Snapshot', ['version', 'timestamp', 'data'])
+
+class TickProducer:
+    """Runs compute(previous_data) once per interval on a daemon thread and publishes a versioned snapshot.
+
+    Hold one per process with st.cache_resource; sessions only call latest() and render.
+    """
+
+    def __init__(self, compute, interval=1.0, name='tick-producer'):
+        self.interval = interval
+        self.name = name
+        self._compute = compute
+        self._lock = threading.Lock()
+        self._published = threading.Condition()
+        self._stopped = threading.Event()
+        # First tick is computed inline so readers never see an empty snapshot
+        self._snapshot = Snapshot(1, time.time(), compute(None))
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _publish(self, data):
+        with self._published:
+            self._snapshot = Snapshot(self._snapshot.version + 1, time.time(), data)
+            self._published.notify_all()
+
+    def _run(self):
+        next_tick = time.monotonic() + self.interval
+        while not self._stopped.wait(max(next_tick - time.monotonic(), 0)):
+            # Overruns skip ticks instead of queueing them up
+            next_tick = max(next_tick + self.interval, time.monotonic())
+            started = time.monotonic()
+            with instrument.stage(f'{self.name}.tick', sample=True):
+                self.update(self._compute)
+            if time.monotonic() - started > self.interval:
+                instrument.RECORDER.count(f'{self.name}.overrun')
+
+    def update(self, fn):
+        """Apply fn(data) -> data under the producer lock, e.g. for a button that edits shared state"""
+        with self._lock:
+            try:
+                data = fn(self._snapshot.data)
+            except Exception:
+                logger.exception("Tick computation failed; keeping the previous snapshot")
+                return self._snapshot
+            self._publish(data)
+            return self._snapshot
+
+    def latest(self):
+        return self._snapshot
+
+    def wait_newer(self, version, timeout=None):
+        with self._published:
+            self._published.wait_for(lambda: self._snapshot.version > version, timeout)
+            return self._snapshot
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
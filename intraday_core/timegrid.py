@@ -0,0 +1,58 @@
+import functools
+import numpy as np
+import pandas as pd
+
+RESOLUTION_MINUTES = {'PT15M': 15, 'PT30M': 30, 'PT60M': 60}
+# Label suffix of the sub-hour periods, e.g. H7-Q3
+SUB_HOUR_PREFIX = {15: 'Q', 30: 'HH'}
+
+class TimeGrid:
+    """Delivery periods of one day at a fixed resolution, with labels and index arrays computed once.
+
+    Converting between grids is a reshape: finer → coarser averages the periods inside each coarse
+    period (ignoring gaps), coarser → finer repeats each value.
+    """
+
+    def __init__(self, resolution):
+        self.resolution = resolution
+        self.minutes = RESOLUTION_MINUTES[resolution]
+        self.periods = 1440 // self.minutes
+        self.per_hour = 60 // self.minutes
+        self.index = pd.RangeIndex(self.periods, name='period')
+        self.start_minutes = np.arange(self.periods) * self.minutes
+        self.hour = self.start_minutes // 60
+        if self.per_hour == 1:
+            self.labels = np.array([f'H{h + 1}' for h in range(24)])
+        else:
+            prefix = SUB_HOUR_PREFIX[self.minutes]
+            self.labels = np.array([f'H{h + 1}-{prefix}{k + 1}' for h in range(24) for k in range(self.per_hour)])
+
+    def __len__(self):
+        return self.periods
+
+    def __repr__(self):
+        return f'TimeGrid({self.resolution!r})'
+
+    def to(self, target, values):
+        """Values on this grid (periods on the last axis) converted to the target grid"""
+        values = np.asarray(values, dtype=float)
+        if target.minutes < self.minutes:
+            return np.repeat(values, self.minutes // target.minutes, axis=-1)
+        if target.minutes == self.minutes:
+            return values
+        blocks = values.reshape(*values.shape[:-1], target.periods, target.minutes // self.minutes)
+        counts = (~np.isnan(blocks)).sum(axis=-1)
+        return np.where(counts > 0, np.nansum(blocks, axis=-1) / np.maximum(counts, 1), np.nan)
+
+    def resample(self, frame, target):
+        """Day × period frame on this grid as a day × period frame on the target grid"""
+        if frame.empty or target is self: return frame
+        return pd.DataFrame(self.to(target, frame.to_numpy(dtype=float)), index=frame.index, columns=target.index)
+
+@functools.lru_cache(maxsize=None)
+def get(resolution):
+    return TimeGrid(resolution)
+
+HOURLY = get('PT60M')
+HALF_HOURLY = get('PT30M')
+QUARTER_HOURLY = get('PT15M')
@@ -3,73 +3,68 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
+from intraday_core import curves, instrument, sources, tables, ticks, timegrid
+from config import DIAGNOSTICS, TICK_SOURCE
+
+instrument.configure(**DIAGNOSTICS)
 
 st.markdown("# 📈 **ID vs DA Curve - 24H Comparison**")
 
+# Base shape for a typical daily power price curve
+peak_shape = np.array([
+    35, 30, 28, 25, 28, 32, # H1-H6: Overnight low
+    55, 65, 70, 60, # H7-H10: Morning peak
+    50, 45, 42, 40, 43, 48, # H11-H16: Mid-day solar dip
+    65, 75, 80, 72, 68, # H17-H21: Evening peak
+    55, 45, 40 # H22-H24: Late night decline
+])
+
+# =========================
+# BASE HOURLY SHAPE (24 HOURS), EXPANDED TO 15-MIN (96 QH)
+# =========================
+peak_shape_hourly = np.array([
+    35, 35.2, 35.1, 33, 30, 29, 29, 27, 28, 28, 29, 31,
+    25, 25, 25, 23, 28, 28, 27, 29, 32, 35, 35, 35
+])
+peak_shape_15m = timegrid.HOURLY.to(timegrid.QUARTER_HOURLY, peak_shape_hourly)
+
+CURVE_COLUMNS = ['DA €/MWh', 'ID €/MWh', 'Spread €', 'Spread %']
+
+@st.cache_resource
+def table_render(name):
+    return tables.TableRender(name)
+
+@st.cache_resource
+def curves_producer():
+    # Separate fixed-capacity windows (and their rolling stats) per resolution
+    windows = curves.CurveWindows({'60m': peak_shape, '15m': peak_shape_15m}, CURVE_COLUMNS)
+    source = sources.open_source(**TICK_SOURCE)
+    return ticks.TickProducer(lambda previous: windows.tick(source.next('shape', windows.draw)),
+                              interval=source.interval('shape', 1.0), name='shape-curves')
+
+def spread_metrics(stats):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Max Spread", f"{stats['max']:.1f}€")
+    with col2:
+        st.metric("Avg Spread", f"{stats['mean']:.1f}€")
+    with col3:
+        st.metric("Volatility", f"{stats['std']:.1f}€")
+    with col4:
+        st.metric("Latest Spread z", f"{stats['zscore']:+.1f}σ", help=f"P5 {stats['p05']:.1f}€ · P50 {stats['p50']:.1f}€ · P95 {stats['p95']:.1f}€")
+
+curve_views_tick = curves_producer().latest()
+curve_views = curve_views_tick.data
+render_started = time.perf_counter()
+
 tab1, tab2 = st.tabs(["60 Mins", "15 Mins"])
 with tab1:
-    # Base shape for a typical daily power price curve
-    peak_shape = np.array([
-        35, 30, 28, 25, 28, 32, # H1-H6: Overnight low
-        55, 65, 70, 60, # H7-H10: Morning peak
-        50, 45, 42, 40, 43, 48, # H11-H16: Mid-day solar dip
-        65, 75, 80, 72, 68, # H17-H21: Evening peak
-        55, 45, 40 # H22-H24: Late night decline
-    ])
-
-    @st.cache_data
-    def generate_initial_data():
-        """Fake DA/ID curves with realistic spreads for the first 24 hours"""
-        # Use the peak_shape and add some noise for DA prices
-        da_base = peak_shape + np.random.uniform(-3, 3, 24)
-        id_spread = np.random.uniform(-2.0, 3.0, 24)
-        id_prices = da_base + id_spread
-        
-        data = pd.DataFrame({
-            'DA €/MWh': np.round(da_base, 2),
-            'ID €/MWh': np.round(id_prices, 2),
-            'Spread €': np.round(id_spread, 2),
-            'Spread %': np.round((id_spread / da_base) * 100, 1)
-        })
-        return data
-
-    # Initialize or update data in session state - KEEP LAST 24 ROWS ONLY
-    if 'curve_data' not in st.session_state:
-        st.session_state.curve_data = generate_initial_data()
-    else:
-        # Shift: remove oldest row, add new data
-        df = st.session_state.curve_data.iloc[1:].copy()
-        
-        new_da = peak_shape[0] + np.random.uniform(-3, 3)  # Use peak_shape for new "H1"
-        new_spread = np.random.uniform(-2.0, 3.0)
-        new_id = new_da + new_spread
-        
-        new_row = pd.DataFrame({
-            'DA €/MWh': [np.round(new_da, 2)],
-            'ID €/MWh': [np.round(new_id, 2)],
-            'Spread €': [np.round(new_spread, 2)],
-            'Spread %': [np.round((new_spread / new_da) * 100, 1)]
-        })
-        
-        st.session_state.curve_data = pd.concat([df, new_row], ignore_index=True)
-        
-        # TRIM TO EXACTLY 24 ROWS to prevent unlimited growth
-        st.session_state.curve_data = st.session_state.curve_data.tail(24).reset_index(drop=True)
-
     # Always create fresh display DataFrame with fixed Hour labels
-    df_display = st.session_state.curve_data.tail(24).copy().reset_index(drop=True)
-    df_display.insert(0, 'Hour', [f'H{i+1}' for i in range(len(df_display))])
-
-    df = df_display  # Use this for metrics and display
+    df_display = pd.DataFrame(curve_views['60m'], columns=CURVE_COLUMNS)
+    df_display.insert(0, 'Hour', timegrid.HOURLY.labels[:len(df_display)])
 
     # METRICS FRONT AND CENTER (always visible)
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Max Spread", f"{df['Spread €'].max():.1f}€")
-    with col2:
-        st.metric("Avg Spread", f"{df['Spread €'].mean():.1f}€")
-    with col3:
-        st.metric("Volatility", f"{df['Spread €'].std():.1f}€")
+    spread_metrics(curve_views['stats']['60m'])
 
     def color_spread(val):
         if isinstance(val, (int, float)):
@@ -77,82 +72,28 @@ with tab1:
         return ''
 
     # FIXED ORDER: Make Hour categorical so it can't be sorted out of order
-    hour_order = [f'H{i}' for i in range(1, 25)]
-    df_display['Hour'] = pd.Categorical(df_display['Hour'], categories=hour_order, ordered=True)
+    df_display['Hour'] = pd.Categorical(df_display['Hour'], categories=timegrid.HOURLY.labels, ordered=True)
+
+    def style_curve(frame):
+        return frame.style.format({
+            'DA €/MWh': '{:.2f}',
+            'ID €/MWh': '{:.2f}',
+            'Spread €': '{:.2f}',
+            'Spread %': '{:.1f}%'
+        }).map(color_spread, subset=['Spread €', 'Spread %'])
 
-    styled_df = df_display.style.format({
-        'DA €/MWh': '{:.2f}',
-        'ID €/MWh': '{:.2f}',
-        'Spread €': '{:.2f}',
-        'Spread %': '{:.1f}%'
-    }).applymap(color_spread, subset=['Spread €', 'Spread %'])
+    # Styled once per producer tick for every session
+    styled_df = table_render('shape.60m').render(curve_views_tick.version, df_display, style_curve)
 
     st.dataframe(styled_df, use_container_width=True, height=600, hide_index=True)
 
 with tab2:
-    # =========================
-    # BASE HOURLY SHAPE (24 HOURS)
-    # =========================
-    peak_shape_hourly = np.array([
-        35, 35.2, 35.1, 33, 30, 29, 29, 27, 28, 28, 29, 31,
-        25, 25, 25, 23, 28, 28, 27, 29, 32, 35, 35, 35
-    ])
-
-    # =========================
-    # EXPAND TO 15-MIN (96 QH)
-    # =========================
-    peak_shape_15m = np.repeat(peak_shape_hourly, 4)
-
-    # =========================
-    # DATA GENERATOR (CACHE VERSIONED)
-    # =========================
-    @st.cache_data(show_spinner=False)
-    def generate_initial_data_v2():  # <-- version bump fixes cache
-        da_base = peak_shape_15m + np.random.uniform(-3, 3, 96)
-        id_spread = np.random.uniform(-2.0, 3.0, 96)
-        id_prices = da_base + id_spread
-
-        return pd.DataFrame({
-            'DA €/MWh': np.round(da_base, 2),
-            'ID €/MWh': np.round(id_prices, 2),
-            'Spread €': np.round(id_spread, 2),
-            'Spread %': np.round((id_spread / da_base) * 100, 1)
-        })
-
-    # =========================
-    # SESSION STATE
-    # =========================
-    if 'curve_data' not in st.session_state:
-        st.session_state.curve_data = generate_initial_data_v2()
-    else:
-        df = st.session_state.curve_data.iloc[1:].copy()
-
-        new_da = peak_shape_15m[0] + np.random.uniform(-3, 3)
-        new_spread = np.random.uniform(-2.0, 3.0)
-        new_id = new_da + new_spread
-
-        new_row = pd.DataFrame({
-            'DA €/MWh': [round(new_da, 2)],
-            'ID €/MWh': [round(new_id, 2)],
-            'Spread €': [round(new_spread, 2)],
-            'Spread %': [round((new_spread / new_da) * 100, 1)]
-        })
-
-        st.session_state.curve_data = pd.concat([df, new_row], ignore_index=True)
-        st.session_state.curve_data = (
-            st.session_state.curve_data.tail(96).reset_index(drop=True)
-        )
-
     # =========================
     # DISPLAY DATA
     # =========================
-    df_display = st.session_state.curve_data.copy()
+    df_display = pd.DataFrame(curve_views['15m'], columns=CURVE_COLUMNS)
 
-    quarter_labels = [
-        f'H{h}-Q{q}'
-        for h in range(1, 25)
-        for q in range(1, 5)
-    ]
+    quarter_labels = timegrid.QUARTER_HOURLY.labels
 
     # ✅ SAFE: slice labels to df length
     df_display.insert(0, 'Hour', quarter_labels[:len(df_display)])
@@ -166,13 +107,7 @@ with tab2:
     # =========================
     # METRICS
     # =========================
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Max Spread", f"{df_display['Spread €'].max():.1f}€")
-    with col2:
-        st.metric("Avg Spread", f"{df_display['Spread €'].mean():.1f}€")
-    with col3:
-        st.metric("Volatility", f"{df_display['Spread €'].std():.1f}€")
+    spread_metrics(curve_views['stats']['15m'])
 
     # =========================
     # STYLING
@@ -182,21 +117,26 @@ with tab2:
             return 'background-color: #90EE90' if val < 0 else 'background-color: #FFB6C1'
         return ''
 
-    styled_df = (
-        df_display.style
-        .format({
-            'DA €/MWh': '{:.2f}',
-            'ID €/MWh': '{:.2f}',
-            'Spread €': '{:.2f}',
-            'Spread %': '{:.1f}%'
-        })
-        .applymap(color_spread, subset=['Spread €', 'Spread %'])
-    )
+    def style_curve(frame):
+        return (
+            frame.style
+            .format({
+                'DA €/MWh': '{:.2f}',
+                'ID €/MWh': '{:.2f}',
+                'Spread €': '{:.2f}',
+                'Spread %': '{:.1f}%'
+            })
+            .map(color_spread, subset=['Spread €', 'Spread %'])
+        )
+
+    styled_df = table_render('shape.15m').render(curve_views_tick.version, df_display, style_curve)
 
     st.dataframe(styled_df, use_container_width=True, height=600, hide_index=True)
 
     # =========================
     # AUTO REFRESH
     # =========================
-time.sleep(1)
+instrument.RECORDER.record('shape.render', time.perf_counter() - render_started)
+with instrument.stage('shape.sleep'):
+    time.sleep(1)
 st.rerun()
\ No newline at end of file
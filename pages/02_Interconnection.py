@@ -2,74 +2,124 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
+import logging
 import time
+import sqlite3
+import requests
+import xml.etree.ElementTree as ET
+from intraday_core import curves, entsoe, instrument, sources, tables, ticks, timegrid
+from config import ENTSOE_API_KEY, ENTSOE_API_KEY_PLACEHOLDER, PRICE_STORE_PATH, DIAGNOSTICS, TICK_SOURCE
+
+instrument.configure(**DIAGNOSTICS)
+logger = logging.getLogger(__name__)
+
+# A failed border price fetch is not cached; the producer retries it at most this often
+FETCH_RETRY_SECONDS = 60
+FETCH_ERRORS = (requests.exceptions.RequestException, ET.ParseError, sqlite3.Error)
 
 st.markdown("# 📈 **CH vs FR Curve - 24H Comparison**")
 
+@st.cache_data(ttl=3600)
+def fetch_border_prices(api_key, end_day, days_to_fetch):
+    """CH and its neighbouring zones per quarter hour on one UTC index (empty without an API key)"""
+    # Errors propagate uncached to compute_interconnection_tick, which runs off any session
+    if not api_key or api_key == ENTSOE_API_KEY_PLACEHOLDER:
+        return pd.DataFrame()
+    return entsoe.load_area_prices(api_key, entsoe.BIDDING_ZONES, end_day, days_to_fetch, PRICE_STORE_PATH, grid=timegrid.QUARTER_HOURLY)
+
+def quarter_border_prices(previous):
+    # (prices, fetch error, failed at); a failure is carried on every tick until its retry is due
+    if previous and previous['fetch_error'] and time.time() - previous['fetch_failed_at'] < FETCH_RETRY_SECONDS:
+        return pd.DataFrame(), previous['fetch_error'], previous['fetch_failed_at']
+    try:
+        return fetch_border_prices(ENTSOE_API_KEY, datetime.now().date(), days_to_fetch=1), None, None
+    except FETCH_ERRORS as e:
+        logger.warning("Could not fetch border prices: %s", e)
+        return pd.DataFrame(), f"API error: {e}. Could not fetch border prices.", time.time()
+
+def hourly_border_prices(prices):
+    # Each hour is the mean of its published quarters, as timegrid converts finer to coarser periods
+    quarters = timegrid.QUARTER_HOURLY
+    values = prices.to_numpy(dtype=float).T.reshape(len(prices.columns), -1, quarters.periods)
+    hourly = quarters.to(timegrid.HOURLY, values).reshape(len(prices.columns), -1).T
+    return pd.DataFrame(hourly, index=prices.index[::quarters.per_hour], columns=prices.columns)
+
+def border_views(views, name, prices, grid):
+    # Real CH/FR prices replace the synthetic window; stats over the whole real curve
+    views[name] = curves.border_curve(prices, len(grid))
+    views['stats'][name] = curves.curve_stats(views[name], SPREAD_INTER)
+
+# Base shape for a typical daily power price curve
+peak_shape_interconnection = np.array([
+    35, 30, 28, 25, 28, 32, # H1-H6: Overnight low
+    55, 65, 70, 60, # H7-H10: Morning peak
+    50, 45, 42, 40, 43, 48, # H11-H16: Mid-day solar dip
+    65, 75, 80, 72, 68, # H17-H21: Evening peak
+    55, 45, 40 # H22-H24: Late night decline
+])
+
+# =========================
+# BASE HOURLY SHAPE (24 HOURS), EXPANDED TO 15-MIN (96 QH)
+# =========================
+peak_shape_hourly_inter = np.array([
+    35, 35.2, 35.1, 33, 30, 29, 29, 27, 28, 28, 29, 31,
+    25, 25, 25, 23, 28, 28, 27, 29, 32, 35, 35, 35
+])
+peak_shape_15m_inter = timegrid.HOURLY.to(timegrid.QUARTER_HOURLY, peak_shape_hourly_inter)
+
+CURVE_COLUMNS_INTER = ['CH €/MWh', 'FR €/MWh', 'Spread €', 'Spread %']
+SPREAD_INTER = CURVE_COLUMNS_INTER.index('Spread €')
+
+def compute_interconnection_tick(windows, previous):
+    # One O(1) append per window per process tick; real CH/FR prices replace the synthetic curves when available
+    # One quarter-hour fetch feeds both resolutions
+    quarter_prices, fetch_error, failed_at = quarter_border_prices(previous)
+    border_prices = hourly_border_prices(quarter_prices) if not quarter_prices.empty else quarter_prices
+    views = windows.tick(sources.open_source(**TICK_SOURCE).next('interconnection', windows.draw))
+    if not border_prices.empty:
+        border_views(views, '60m', border_prices, timegrid.HOURLY)
+        border_views(views, '15m', quarter_prices, timegrid.QUARTER_HOURLY)
+    views['border_prices'] = border_prices
+    views['fetch_error'], views['fetch_failed_at'] = fetch_error, failed_at
+    return views
+
+@st.cache_resource
+def table_render(name):
+    return tables.TableRender(name)
+
+@st.cache_resource
+def interconnection_producer():
+    # Separate fixed-capacity windows (and their rolling stats) per resolution
+    windows = curves.CurveWindows({'60m': peak_shape_interconnection, '15m': peak_shape_15m_inter}, CURVE_COLUMNS_INTER)
+    interval = sources.open_source(**TICK_SOURCE).interval('interconnection', 1.0)
+    return ticks.TickProducer(lambda previous: compute_interconnection_tick(windows, previous), interval=interval, name='interconnection-curves')
+
+def spread_metrics_inter(stats):
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Max Spread", f"{stats['max']:.1f}€")
+    with col2:
+        st.metric("Avg Spread", f"{stats['mean']:.1f}€")
+    with col3:
+        st.metric("Volatility", f"{stats['std']:.1f}€")
+    with col4:
+        st.metric("Latest Spread z", f"{stats['zscore']:+.1f}σ", help=f"P5 {stats['p05']:.1f}€ · P50 {stats['p50']:.1f}€ · P95 {stats['p95']:.1f}€")
+
+curves_inter_tick = interconnection_producer().latest()
+curves_inter = curves_inter_tick.data
+render_started = time.perf_counter()
+border_prices = curves_inter['border_prices']
+if curves_inter['fetch_error']:
+    st.error(curves_inter['fetch_error'])
+
 tab1_inter, tab2_inter = st.tabs(["60 Mins", "15 Mins"])
 with tab1_inter:
-    # Base shape for a typical daily power price curve
-    peak_shape_interconnection = np.array([
-        35, 30, 28, 25, 28, 32, # H1-H6: Overnight low
-        55, 65, 70, 60, # H7-H10: Morning peak
-        50, 45, 42, 40, 43, 48, # H11-H16: Mid-day solar dip
-        65, 75, 80, 72, 68, # H17-H21: Evening peak
-        55, 45, 40 # H22-H24: Late night decline
-    ])
-
-    @st.cache_data
-    def generate_initial_data_interconnection():
-        """Fake DA/ID curves with realistic spreads for the first 24 hours"""
-        # Use the peak_shape and add some noise for DA prices
-        da_base_interconnection = peak_shape_interconnection + np.random.uniform(-3, 3, 24)
-        id_spread_interconnection = np.random.uniform(-2.0, 3.0, 24)
-        id_prices_interconnection = da_base_interconnection + id_spread_interconnection
-        
-        data_interconnection = pd.DataFrame({
-            'CH €/MWh': np.round(da_base_interconnection, 2),
-            'FR €/MWh': np.round(id_prices_interconnection, 2),
-            'Spread €': np.round(id_spread_interconnection, 2),
-            'Spread %': np.round((id_spread_interconnection / da_base_interconnection) * 100, 1)
-        })
-        return data_interconnection
-
-    # Initialize or update data in session state - KEEP LAST 24 ROWS ONLY
-    if 'curve_data_inter' not in st.session_state:
-        st.session_state.curve_data_inter = generate_initial_data_interconnection()
-    else:
-        # Shift: remove oldest row, add new data
-        df_interconnection = st.session_state.curve_data_inter.iloc[1:].copy()
-        
-        new_da_interconnection = peak_shape_interconnection[0] + np.random.uniform(-3, 3)  # Use peak_shape for new "H1"
-        new_spread_interconnection = np.random.uniform(-2.0, 3.0)
-        new_id_interconnection = new_da_interconnection + new_spread_interconnection
-        
-        new_row_interconnection = pd.DataFrame({
-            'CH €/MWh': [np.round(new_da_interconnection, 2)],
-            'FR €/MWh': [np.round(new_id_interconnection, 2)],
-            'Spread €': [np.round(new_spread_interconnection, 2)],
-            'Spread %': [np.round((new_spread_interconnection / new_da_interconnection) * 100, 1)]
-        })
-        
-        st.session_state.curve_data_inter = pd.concat([df_interconnection, new_row_interconnection], ignore_index=True)
-        
-        # TRIM TO EXACTLY 24 ROWS to prevent unlimited growth
-        st.session_state.curve_data_inter = st.session_state.curve_data_inter.tail(24).reset_index(drop=True)
-
     # Always create fresh display DataFrame with fixed Hour labels
-    df_display_inter = st.session_state.curve_data_inter.tail(24).copy().reset_index(drop=True)
-    df_display_inter.insert(0, 'Hour', [f'H{i+1}' for i in range(len(df_display_inter))])
-
-    df = df_display_inter  # Use this for metrics and display
+    df_display_inter = pd.DataFrame(curves_inter['60m'], columns=CURVE_COLUMNS_INTER)
+    df_display_inter.insert(0, 'Hour', timegrid.HOURLY.labels[:len(df_display_inter)])
 
     # METRICS FRONT AND CENTER (always visible)
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Max Spread", f"{df['Spread €'].max():.1f}€")
-    with col2:
-        st.metric("Avg Spread", f"{df['Spread €'].mean():.1f}€")
-    with col3:
-        st.metric("Volatility", f"{df['Spread €'].std():.1f}€")
+    spread_metrics_inter(curves_inter['stats']['60m'])
 
     def color_spread(val):
         if isinstance(val, (int, float)):
@@ -77,81 +127,32 @@ with tab1_inter:
         return ''
 
     # FIXED ORDER: Make Hour categorical so it can't be sorted out of order
-    hour_order_inter = [f'H{i}' for i in range(1, 25)]
-    df_display_inter['Hour'] = pd.Categorical(df_display_inter['Hour'], categories=hour_order_inter, ordered=True)
-
-    styled_df_inter = df_display_inter.style.format({
-        'CH €/MWh': '{:.2f}',
-        'FR €/MWh': '{:.2f}',
-        'Spread €': '{:.2f}',
-        'Spread %': '{:.1f}%'
-    }).applymap(color_spread, subset=['Spread €', 'Spread %'])
-
-    st.dataframe(styled_df_inter, use_container_width=True, height=600, hide_index=True)
-with tab2_inter:
-     # =========================
-    # BASE HOURLY SHAPE (24 HOURS)
-    # =========================
-    peak_shape_hourly_inter = np.array([
-        35, 35.2, 35.1, 33, 30, 29, 29, 27, 28, 28, 29, 31,
-        25, 25, 25, 23, 28, 28, 27, 29, 32, 35, 35, 35
-    ])
+    df_display_inter['Hour'] = pd.Categorical(df_display_inter['Hour'], categories=timegrid.HOURLY.labels, ordered=True)
 
-    # =========================
-    # EXPAND TO 15-MIN (96 QH)
-    # =========================
-    peak_shape_15m_inter = np.repeat(peak_shape_hourly_inter, 4)
+    def style_curve(frame):
+        return frame.style.format({
+            'CH €/MWh': '{:.2f}',
+            'FR €/MWh': '{:.2f}',
+            'Spread €': '{:.2f}',
+            'Spread %': '{:.1f}%'
+        }).map(color_spread, subset=['Spread €', 'Spread %'])
 
-    # =========================
-    # DATA GENERATOR (CACHE VERSIONED)
-    # =========================
-    @st.cache_data(show_spinner=False)
-    def generate_initial_data_v2_inter():  # <-- version bump fixes cache
-        da_base = peak_shape_15m_inter + np.random.uniform(-3, 3, 96)
-        id_spread = np.random.uniform(-2.0, 3.0, 96)
-        id_prices = da_base + id_spread
-
-        return pd.DataFrame({
-            'CH €/MWh': np.round(da_base, 2),
-            'FR €/MWh': np.round(id_prices, 2),
-            'Spread €': np.round(id_spread, 2),
-            'Spread %': np.round((id_spread / da_base) * 100, 1)
-        })
+    # Styled once per producer tick for every session
+    styled_df_inter = table_render('interconnection.60m').render(curves_inter_tick.version, df_display_inter, style_curve)
 
-    # =========================
-    # SESSION STATE
-    # =========================
-    if 'curve_data_inter' not in st.session_state:
-        st.session_state.curve_data_inter = generate_initial_data_v2_inter()
-    else:
-        df_inter = st.session_state.curve_data_inter.iloc[1:].copy()
-
-        new_da_interconnection = peak_shape_15m_inter[0] + np.random.uniform(-3, 3)
-        new_spread_interconnection = np.random.uniform(-2.0, 3.0)
-        new_id_interconnection = new_da_interconnection + new_spread_interconnection
-
-        new_row_interconnection = pd.DataFrame({
-            'CH €/MWh': [round(new_da_interconnection, 2)],
-            'FR €/MWh': [round(new_id_interconnection, 2)],
-            'Spread €': [round(new_spread_interconnection, 2)],
-            'Spread %': [round((new_spread_interconnection / new_da_interconnection) * 100, 1)]
-        })
-
-        st.session_state.curve_data_inter = pd.concat([df_inter, new_row_interconnection], ignore_index=True)
-        st.session_state.curve_data_inter = (
-            st.session_state.curve_data_inter.tail(96).reset_index(drop=True)
-        )
+    st.dataframe(styled_df_inter, use_container_width=True, height=600, hide_index=True)
 
+    if not border_prices.empty:
+        border_spreads = border_prices.drop(columns='CH').sub(border_prices['CH'], axis=0)
+        st.markdown("**Border spreads vs CH (€/MWh)**")
+        st.dataframe(border_spreads.agg(['mean', 'min', 'max']).T.round(2), use_container_width=True)
+with tab2_inter:
     # =========================
     # DISPLAY DATA
     # =========================
-    df_display_inter = st.session_state.curve_data_inter.copy()
+    df_display_inter = pd.DataFrame(curves_inter['15m'], columns=CURVE_COLUMNS_INTER)
 
-    quarter_labels = [
-        f'H{h}-Q{q}'
-        for h in range(1, 25)
-        for q in range(1, 5)
-    ]
+    quarter_labels = timegrid.QUARTER_HOURLY.labels
 
     # ✅ SAFE: slice labels to df length
     df_display_inter.insert(0, 'Hour', quarter_labels[:len(df_display_inter)])
@@ -165,13 +166,7 @@ with tab2_inter:
     # =========================
     # METRICS
     # =========================
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Max Spread", f"{df_display_inter['Spread €'].max():.1f}€")
-    with col2:
-        st.metric("Avg Spread", f"{df_display_inter['Spread €'].mean():.1f}€")
-    with col3:
-        st.metric("Volatility", f"{df_display_inter['Spread €'].std():.1f}€")
+    spread_metrics_inter(curves_inter['stats']['15m'])
 
     # =========================
     # STYLING
@@ -181,18 +176,23 @@ with tab2_inter:
             return 'background-color: #90EE90' if val < 0 else 'background-color: #FFB6C1'
         return ''
 
-    styled_df_inter = (
-        df_display_inter.style
-        .format({
-            'CH €/MWh': '{:.2f}',
-            'FR €/MWh': '{:.2f}',
-            'Spread €': '{:.2f}',
-            'Spread %': '{:.1f}%'
-        })
-        .applymap(color_spread, subset=['Spread €', 'Spread %'])
-    )
+    def style_curve(frame):
+        return (
+            frame.style
+            .format({
+                'CH €/MWh': '{:.2f}',
+                'FR €/MWh': '{:.2f}',
+                'Spread €': '{:.2f}',
+                'Spread %': '{:.1f}%'
+            })
+            .map(color_spread, subset=['Spread €', 'Spread %'])
+        )
+
+    styled_df_inter = table_render('interconnection.15m').render(curves_inter_tick.version, df_display_inter, style_curve)
 
     st.dataframe(styled_df_inter, use_container_width=True, height=600, hide_index=True)
 
-time.sleep(1)
+instrument.RECORDER.record('interconnection.render', time.perf_counter() - render_started)
+with instrument.stage('interconnection.sleep'):
+    time.sleep(1)
 st.rerun()
\ No newline at end of file
@@ -1,7 +1,9 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 import time
+from intraday_core import instrument, journal, sources, ticks
+from config import JOURNAL_PATH, JOURNAL_RETENTION_DAYS, DIAGNOSTICS, TICK_SOURCE
+
+instrument.configure(**DIAGNOSTICS)
 
 st.markdown("# 📋 **EXECUTION LOG - Live Append**")
 st.markdown("**_Strategies trigger → Real-time journal_**")
@@ -9,55 +11,53 @@ st.markdown("**_Strategies trigger → Real-time journal_**")
 # Wide Bloomberg layout
 st.set_page_config(layout="wide")
 
-# Session state for persistent append
-if 'logs' not in st.session_state:
-    st.session_state.logs = pd.DataFrame(columns=[
-        'Time', 'Hour', 'Trigger', 'EXEC PLAN', 'FENCE', 'Status', 'P&L €k', 'Notes'
-    ])
-
-# SLOWER Append: 20% chance (1 log every ~5 refreshes)
-if np.random.random() < 2:
-    new_log = {
-        'Time': pd.Timestamp.now().strftime('%H:%M:%S'),
-        'Hour': f'H{np.random.randint(1,25)}',
-        'Trigger': np.random.choice(['MOM+1.2🔵', 'LOB60🔴', 'IMB82%', 'VAR120k', 'SHAPE-0.8']),
-        'EXEC PLAN': np.random.choice([
-            "2×BLOCK + 2×LARGE CLIP + 1×ICEBERG + 1×LADDER",
-            "3×BLOCK + 1×CLIP + 2×ICEBERG",
-            "1×BLOCK + 3×LARGE CLIP + 2×LADDER"
-        ]),
-        'FENCE': f"{np.random.randint(120,220)}MW €{np.random.randint(45,50)}P/€{np.random.randint(52,56)}C collar",
-        'Status': np.random.choice(['✅ EXEC', '⏳ PENDING']),
-        'P&L €k': np.random.randint(-30, 80),
-        'Notes': np.random.choice(['Full fill', 'Partial 80%', 'Low slippage'])
-    }
-    st.session_state.logs = pd.concat([st.session_state.logs, pd.DataFrame([new_log])], ignore_index=True)
-    
-    # Cap at 30 logs for demo
-    if len(st.session_state.logs) > 30:
-        st.session_state.logs = st.session_state.logs.tail(30).reset_index(drop=True)
+PAGE_SIZE = 100
+
+@st.cache_resource
+def get_journal():
+    return journal.Journal(JOURNAL_PATH, retention_days=JOURNAL_RETENTION_DAYS)
+
+def compute_logs_tick(previous):
+    # One journal shared by every session, appended once per producer tick
+    new_log = sources.open_source(**TICK_SOURCE).next('logs', journal.demo_entry)
+    get_journal().append(new_log)
+    get_journal().flush()
+    return {'last_id': get_journal().last_id()}
+
+@st.cache_resource
+def logs_producer():
+    interval = sources.open_source(**TICK_SOURCE).interval('logs', 3.0)
+    return ticks.TickProducer(compute_logs_tick, interval=interval, name='execution-log')
 
-df_logs = st.session_state.logs
+logs_producer()
+render_started = time.perf_counter()
+log_journal = get_journal()
+# "Clear" only hides older entries for this session; the journal itself is append-only,
+# so the KPIs are the running totals minus the totals at the time of the clear
+cleared_after, cleared_totals = st.session_state.get('logs_cleared', (0, None))
+totals = journal.since(log_journal.totals(), cleared_totals)
 
-# Hour filter
-selected_hour = st.selectbox("**Filter by Hour:**", ['All'] + sorted(df_logs['Hour'].unique().tolist()))
+# Hour / trigger filters, both served by an index on the journal
+filter_col1, filter_col2 = st.columns(2)
+selected_hour = filter_col1.selectbox("**Filter by Hour:**", ['All'] + journal.active_values(totals, 'hour'))
+selected_trigger = filter_col2.selectbox("**Filter by Trigger:**", ['All'] + journal.active_values(totals, 'trigger'))
+hour_filter = None if selected_hour == 'All' else selected_hour
+trigger_filter = None if selected_trigger == 'All' else selected_trigger
 
-if selected_hour == 'All':
-    filtered_logs = df_logs
-else:
-    filtered_logs = df_logs[df_logs['Hour'] == selected_hour]
+day_summary = journal.summarize(totals)
+filtered_count = journal.summarize(totals, hour=hour_filter, trigger=trigger_filter)['count']
+page_count = max(-(-filtered_count // PAGE_SIZE), 1)
+page = st.number_input(f"**Page** (of {page_count}, newest first)", min_value=1, max_value=page_count, value=1) - 1
+filtered_logs = log_journal.read_page(page, PAGE_SIZE, hour=hour_filter, trigger=trigger_filter, after_id=cleared_after)
 
 # Bloomberg KPIs
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("**Total Logs**", len(df_logs))
+    st.metric("**Total Logs**", day_summary['count'])
 with col2:
-    avg_pnl = df_logs['P&L €k'].mean() if len(df_logs)>0 else 0
-    st.metric("**Avg P&L**", f"€{avg_pnl:.0f}k")
+    st.metric("**Avg P&L**", f"€{day_summary['avg_pnl']:.0f}k")
 with col3:
-    fence_mws = df_logs['FENCE'].str.extract(r'(\d+)', expand=False).astype(float)
-    avg_fence = fence_mws.mean() if len(fence_mws)>0 else 0
-    st.metric("**Avg Fence**", f"{avg_fence:.0f}MW")
+    st.metric("**Avg Fence**", f"{day_summary['avg_fence']:.0f}MW")
 
 # Styled log table
 def bloomberg_style(row):
@@ -70,7 +70,7 @@ def bloomberg_style(row):
         colors[-2] = 'background-color: #f8d7da'
     return colors
 
-styled_logs = filtered_logs[['Time','Trigger','EXEC PLAN','Status','P&L €k','Notes']].style.apply(bloomberg_style, axis=1).format({'P&L €k': '{:+.0f}'})
+styled_logs = filtered_logs[['Time','Trigger','EXEC PLAN','Status','P&L €k','Notes']].style.apply(bloomberg_style, axis=1).format({'P&L €k': '{:+.0f}'}, na_rep='')
 
 st.markdown("### **_LIVE EXECUTION JOURNAL_**")
 st.dataframe(styled_logs, use_container_width=True, height=600, hide_index=True)
@@ -79,11 +79,10 @@ st.dataframe(styled_logs, use_container_width=True, height=600, hide_index=True)
 with st.expander("⚙️ Demo Controls"):
     col1, col2 = st.columns(2)
     if col1.button("🧹 Clear Logs"):
-        st.session_state.logs = pd.DataFrame(columns=df_logs.columns)
+        st.session_state.logs_cleared = log_journal.checkpoint()
         st.rerun()
     if col2.button("➕ Force Append", type="secondary"):
         new_log = {
-            'Time': pd.Timestamp.now().strftime('%H:%M:%S'),
             'Trigger': 'LOB45🟡',
             'EXEC PLAN': "2×BLOCK + 2×LEER + 1×ICEBERG",
             'FENCE': "148MW €47P/€54C collar",
@@ -91,11 +90,14 @@ with st.expander("⚙️ Demo Controls"):
             'P&L €k': 42,
             'Notes': 'Full execution'
         }
-        st.session_state.logs = pd.concat([st.session_state.logs, pd.DataFrame([new_log])], ignore_index=True)
+        log_journal.append(new_log)
+        log_journal.flush()
         st.rerun()
     
-    st.info("**Refresh 5-7x:** ~1 log every 5 refreshes (20% chance)")
+    st.info("**Shared journal:** one log every 3s for all screens, kept on disk for the trading day")
 
 # Smooth 3s refresh
-time.sleep(3)
+instrument.RECORDER.record('logs.render', time.perf_counter() - render_started)
+with instrument.stage('logs.sleep'):
+    time.sleep(3)
 st.rerun()
\ No newline at end of file
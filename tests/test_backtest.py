@@ -0,0 +1,51 @@
+"""Checks of the strategy backtester; run with python tests/test_backtest.py (or pytest)."""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.join(os.path.dirname(HERE), 'benchmarks')]
+
+import numpy as np
+from intraday_core import backtest, timegrid
+from fixtures import price_history
+
+def test_rule_parameters_change_the_result():
+    prices = price_history(80, grid=timegrid.HOURLY, seed=3)
+    for name, values in {'small_lob': [15, 35], 'iceberg_lob': [35, 45], 'large_lob': [50, 70], 'iceberg_imbalance': [0.6, 0.8]}.items():
+        table = backtest.run(prices, backtest.param_grid(**{name: values}), workers=1)
+        assert table['P&L €'].nunique() == len(values), (name, table['P&L €'].tolist())
+
+def test_each_strategy_executes_its_own_way():
+    strategy = [backtest.STRATEGY[name] for name in ['Market', 'Iceberg', 'Ladder', 'Leer']]
+    action, size, lob_mw, bid_imb = np.array(strategy * 2), np.full(8, 20.0), np.full(8, 60.0), np.full(8, 0.6)
+    # Price rises (resting buys stay partly unfilled), then falls through them
+    change = np.repeat([1.0, -1.0], 4)
+    filled, edge = backtest.execute(action, size, lob_mw, bid_imb, change)
+    assert filled.tolist() == [20, 20 * min(1, backtest.ICEBERG_FILL * 24 / 20), 20 * backtest.LADDER_FILL, 0, 20, 20, 20, 0]
+    assert edge[0] < 0 < edge[1] < edge[2] and edge[3] == 0
+
+def test_strategies_are_credited_with_their_clip_only():
+    table = backtest.run(price_history(80, grid=timegrid.HOURLY, seed=3), [
+        {**backtest.DEFAULTS, 'var_limit': 0}, {**backtest.DEFAULTS, 'var_limit': 1e9, 'imb_limit': 1e9, 'vol_limit': 1e9}], workers=1)
+    parts = ['Residual P&L €', 'Collar P&L €'] + [f'{name} P&L €' for name in backtest.TRADING]
+    assert np.allclose(table[parts].sum(axis=1), table['P&L €'])
+    # Leer waits, so it has no P&L and no hit rate; a fence on every day leaves only the collar
+    assert (table['Leer P&L €'] == 0).all() and table['Leer hit rate'].isna().all()
+    always_fenced, never_fenced = table.iloc[0], table.iloc[1]
+    assert always_fenced['Trades'] == 0 and always_fenced['Residual P&L €'] == 0 and always_fenced['Collar P&L €'] != 0
+    assert never_fenced['Collar P&L €'] == 0 and never_fenced['Residual P&L €'] != 0
+    assert 'Collar hit rate' not in table
+
+def test_quarter_hours_are_valued_as_quarter_hour_energy():
+    prices = price_history(40, seed=3)
+    quarter = backtest.run(prices, [dict(backtest.DEFAULTS)], workers=1)
+    # As MW-hours, the VaR of a quarter-hour book is a quarter of its VaR as hours; vol is position-weighted
+    hour = backtest.run(prices, [{**backtest.DEFAULTS, 'var_limit': 4 * backtest.DEFAULTS['var_limit']}], workers=1, hours=1)
+    assert quarter['Fence days'].iloc[0] == hour['Fence days'].iloc[0] > 0
+    assert np.isclose(quarter['P&L €'].iloc[0], hour['P&L €'].iloc[0] / 4)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
@@ -0,0 +1,132 @@
+"""Parity of blotter.build_blotter with the row loop it replaced; run with python tests/test_blotter_parity.py (or pytest).
+
+Both paths get the same pre-drawn inputs (blotter.draw_tick_inputs) and are compared cell by cell in the loop's
+display format. Later requests changed two things on purpose, so with price history the comparison leaves out
+Var/Vol (now from risk.RiskModel instead of std × 10). It also uses quarter-hour prices that are flat within
+each hour, because quarter rows now read their own products instead of the hour's.
+"""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE)]
+
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from intraday_core import blotter, risk, stats, timegrid
+
+SEEDS = range(5)
+COLUMNS = ['Hour', 'DA€', 'ID Bid€', 'ID Offer€', 'Mid€', 'Shape', 'Var', 'Imb', 'Vol', 'LOB', 'Residual', 'Size', 'Strategy']
+
+def legacy_blotter(inputs, fence_active, historical_prices):
+    # generate_live_hourly_data before vectorization, with row i of the pre-drawn inputs instead of np.random
+    data = []
+    real_prices = historical_prices.iloc[-1].to_dict() if not historical_prices.empty else {}
+    i = 0
+    for h_num in range(1, 25):
+        for quarter in ['', '-Q1', '-Q2', '-Q3', '-Q4']:
+            h = f"H{h_num}{quarter}"
+            h_col_index = h_num - 1
+            hourly_series = historical_prices[h_col_index].dropna() if h_col_index in historical_prices.columns else pd.Series()
+            if len(hourly_series) > 5:
+                hourly_vol = hourly_series.std()
+                hourly_var = hourly_vol * 10
+            else:
+                hourly_vol = inputs['fallback_vol'][i]
+                hourly_var = inputs['fallback_var'][i]
+
+            hourly_imb_mw = inputs['imb_mw'][i]
+            da = real_prices.get(h_col_index, inputs['fallback_da'][i])
+            id_mid = da + inputs['mid_offset'][i]
+            lob_mw = inputs['lob_mw'][i]
+            vwap_pct = inputs['vwap_pct'][i]
+            bid_imb = inputs['bid_imb'][i]
+            offer_imb = 1 - bid_imb
+
+            if lob_mw < 25: size_pct = 0.30
+            elif 25 <= lob_mw <= 40: size_pct = 0.50
+            elif 45 <= lob_mw <= 60: size_pct = 0.75
+            elif lob_mw > 65: size_pct = 1.00
+            elif 40 < lob_mw < 45: size_pct = 0.50
+            else: size_pct = 0.75
+
+            size_mw = lob_mw * size_pct
+            direction_sign = "+" if (bid_imb > offer_imb) else "-"
+            formatted_size = f"{direction_sign}{size_mw:.0f}MW@{id_mid:.2f}"
+
+            ppa_pos, id_pos, da_pos = inputs['ppa_pos'][i], inputs['id_pos'][i], inputs['da_pos'][i]
+            hour_residual = ppa_pos + id_pos + da_pos
+            shape_color = "🟢" if abs(vwap_pct) > 1.0 else ""
+            action, size = "", ""
+
+            if fence_active:
+                residual_direction_sign = "-" if (hour_residual > 0) else "+"
+                action, size = "Collar", f"{residual_direction_sign}€{id_mid - 2:.0f}P/€{id_mid + 2:.0f}C"
+            else:
+                if abs(lob_mw) > 60: action, size = "Market", formatted_size
+                elif 25 <= abs(lob_mw) <= 40 and max(bid_imb, offer_imb) > 0.7: action, size = "Iceberg", formatted_size
+                elif abs(lob_mw) < 25: action, size = "Ladder", formatted_size
+                elif 25 <= abs(lob_mw) <= 60: action, size = "Leer", formatted_size
+
+            data.append({
+                'Hour': h, 'DA€': f"{da:.2f}", 'ID Bid€': f"{id_mid - 0.1:.2f}/{int(lob_mw * bid_imb):.0f}MW",
+                'ID Offer€': f"{id_mid + 0.1:.2f}/{int(lob_mw * offer_imb):.0f}MW", 'Mid€': f"{id_mid:.2f}",
+                'LOB': f"{int(lob_mw)} ", 'Shape': f"{vwap_pct:+.2f}{shape_color}",
+                'Residual': f"{hour_residual} MW", 'Var': f"€{hourly_var:.1f}k",
+                'Vol': f"€{hourly_vol:.2f}", 'Imb': f"{hourly_imb_mw:+.1f}MW",
+                'Strategy': f"{action}", 'Size': size
+            })
+            i += 1
+    return pd.DataFrame(data)[COLUMNS]
+
+def legacy_format(frame, fence_active):
+    # The numeric blotter in the loop's display strings
+    def size(row):
+        if fence_active:
+            return f"{'-' if row['Size'] < 0 else '+'}€{row['Put€']:.0f}P/€{row['Call€']:.0f}C"
+        if np.isnan(row['Size']): return ''
+        return f"{'+' if row['Size'] > 0 else '-'}{abs(row['Size']):.0f}MW@{row['Mid€']:.2f}"
+    return pd.DataFrame({
+        'Hour': frame['Hour'], 'DA€': frame['DA€'].map('{:.2f}'.format),
+        'ID Bid€': [f"{p:.2f}/{mw}MW" for p, mw in zip(frame['ID Bid€'], frame['Bid MW'])],
+        'ID Offer€': [f"{p:.2f}/{mw}MW" for p, mw in zip(frame['ID Offer€'], frame['Offer MW'])],
+        'Mid€': frame['Mid€'].map('{:.2f}'.format), 'Shape': [f"{v:+.2f}{'🟢' if abs(v) > 1.0 else ''}" for v in frame['Shape']],
+        'Var': frame['Var'].map('€{:.1f}k'.format), 'Imb': frame['Imb'].map('{:+.1f}MW'.format), 'Vol': frame['Vol'].map('€{:.2f}'.format),
+        'LOB': frame['LOB'].map('{} '.format), 'Residual': frame['Residual'].map('{} MW'.format),
+        'Size': [size(row) for _, row in frame.iterrows()], 'Strategy': frame['Strategy'].astype(str),
+    })[COLUMNS]
+
+def flat_quarter_history(days=31, seed=0):
+    # Quarter-hour prices equal within each hour, so an hour and its quarters share one price history
+    rng = np.random.default_rng(seed)
+    hourly = 50 + rng.normal(0, 8, (days, len(timegrid.HOURLY))).cumsum(axis=0)
+    index = pd.Index([date(2025, 10, 1) + timedelta(days=d) for d in range(days)], name='day')
+    return pd.DataFrame(np.repeat(hourly, 4, axis=1), index=index, columns=timegrid.QUARTER_HOURLY.index)
+
+def _compare(fence_active, prices, skip=()):
+    history = blotter.product_history(prices)
+    price_stats = stats.PriceStats(history)
+    model = risk.RiskModel(history) if not history.empty else None
+    legacy_history = history.iloc[:, :len(timegrid.HOURLY)]
+    for seed in SEEDS:
+        inputs = blotter.draw_tick_inputs(len(blotter.BLOTTER_LABELS), np.random.RandomState(seed))
+        expected = legacy_blotter(inputs, fence_active, legacy_history).drop(columns=list(skip))
+        frame = blotter.build_blotter(inputs, blotter.BLOTTER_LABELS, blotter.BLOTTER_COLUMNS, fence_active, price_stats, model)
+        actual = legacy_format(frame, fence_active).drop(columns=list(skip))
+        mismatch = expected.ne(actual)
+        assert not mismatch.any().any(), (seed, fence_active, expected[mismatch.any(axis=1)].head(), actual[mismatch.any(axis=1)].head())
+
+def test_parity_without_history():
+    for fence_active in (False, True):
+        _compare(fence_active, pd.DataFrame())
+
+def test_parity_with_history():
+    for fence_active in (False, True):
+        _compare(fence_active, flat_quarter_history(), skip=('Var', 'Vol'))
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
@@ -0,0 +1,111 @@
+"""Checks of the ENTSO-E fetch layer and price store against a local A44 server; run with python tests/test_entsoe.py (or pytest)."""
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.join(os.path.dirname(HERE), 'benchmarks')]
+
+import pandas as pd
+import requests
+from intraday_core import entsoe
+from fixtures import a44_document
+
+AREA = entsoe.BIDDING_ZONES['CH']
+# 40 past delivery days: one full CHUNK_DAYS request and a 9-day one
+END_DAY, DAYS_TO_FETCH = date(2025, 11, 9), 39
+FIRST, SECOND = datetime(2025, 10, 1), datetime(2025, 11, 1)
+
+def _document(start, end):
+    return a44_document((end - start).days, seed=start.toordinal(), start=start)
+
+class _Api(BaseHTTPRequestHandler):
+    # Answers each window with a44_document after any statuses queued for its start in server.statuses
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start, end = (datetime.strptime(query[name][0], '%Y%m%d%H%M') for name in ('periodStart', 'periodEnd'))
+        self.server.requests.append((start, end))
+        time.sleep(self.server.delays.get(start, 0))
+        queued = self.server.statuses.get(start)
+        status, headers = queued.pop(0) if queued else (200, {})
+        body = _document(start, end) if status == 200 else b''
+        self.send_response(status)
+        for name, value in {**headers, 'Content-Length': str(len(body))}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _with_api(check, statuses=None, delays=None):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Api)
+    server.requests, server.statuses, server.delays = [], statuses or {}, delays or {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    directory, backoff = tempfile.mkdtemp(), entsoe.BACKOFF_SECONDS
+    entsoe.BACKOFF_SECONDS = 0
+    try:
+        check(server, lambda: entsoe.load_prices('key', AREA, END_DAY, DAYS_TO_FETCH, os.path.join(directory, 'prices.sqlite'),
+                                                 api_url=f'http://127.0.0.1:{server.server_port}/api'))
+    finally:
+        entsoe.BACKOFF_SECONDS = backoff
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory)
+
+def test_chunks_merge_in_day_order():
+    def check(server, load):
+        prices = load()
+        assert sorted(server.requests) == [(FIRST, SECOND), (SECOND, datetime(2025, 11, 10))], server.requests
+        expected = pd.concat([entsoe.parse_a44(_document(*window)) for window in sorted(server.requests)])
+        pd.testing.assert_frame_equal(prices, expected, check_names=False)
+        assert len(prices) == DAYS_TO_FETCH + 1 and prices.index.is_monotonic_increasing
+    # The first chunk completes last
+    _with_api(check, delays={FIRST: 0.3})
+
+def test_second_call_skips_final_days():
+    def check(server, load):
+        first = load()
+        server.requests.clear()
+        pd.testing.assert_frame_equal(load(), first)
+        assert server.requests == []
+    _with_api(check)
+
+def test_rate_limit_honours_retry_after():
+    def check(server, load):
+        started = time.monotonic()
+        assert not load().empty
+        assert time.monotonic() - started >= 1
+        assert [start for start, _ in server.requests].count(FIRST) == 2
+    _with_api(check, statuses={FIRST: [(429, {'Retry-After': '1'})]})
+
+def test_server_errors_are_retried():
+    def check(server, load):
+        assert len(load()) == DAYS_TO_FETCH + 1
+        assert [start for start, _ in server.requests].count(SECOND) == 3
+    _with_api(check, statuses={SECOND: [(503, {}), (502, {})]})
+
+def test_failed_chunk_keeps_the_others():
+    def check(server, load):
+        try:
+            load()
+            raise AssertionError('a 400 should fail the refresh')
+        except requests.HTTPError:
+            pass
+        server.requests.clear()
+        assert len(load()) == DAYS_TO_FETCH + 1
+        assert server.requests == [(SECOND, datetime(2025, 11, 10))], server.requests
+    # The second chunk fails after the first is stored
+    _with_api(check, statuses={SECOND: [(400, {})]}, delays={SECOND: 0.3})
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
@@ -0,0 +1,71 @@
+"""Checks of feed.MarketFeed against a local SimulatedExchange; run with python tests/test_feed.py (or pytest)."""
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE)]
+
+import numpy as np
+from intraday_core import feed
+
+PERIODS, PUBLISH_SECONDS = 24, 0.2
+
+def _with_feed(check):
+    exchange = feed.SimulatedExchange(PERIODS, rate=4000, seed=7).start()
+    market = feed.MarketFeed(feed.TcpFeed(exchange.host, exchange.port), PERIODS, publish_seconds=PUBLISH_SECONDS)
+    try:
+        check(exchange, market)
+    finally:
+        market.stop()
+        exchange.stop()
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+def _two_sided(snapshot):
+    book = snapshot.data
+    best_bid, best_ask = np.fmax.reduce(book['bid_px'], axis=1), np.fmin.reduce(book['ask_px'], axis=1)
+    return bool(np.all(best_bid < best_ask))
+
+def test_books_are_two_sided():
+    def check(exchange, market):
+        snapshot = market.wait_newer(0, timeout=5)
+        assert snapshot.version == 1 and market.connected
+        assert _two_sided(snapshot)
+        assert (snapshot.data['bid_qty'].sum(axis=1) > 0).all() and (snapshot.data['ask_qty'].sum(axis=1) > 0).all()
+    _with_feed(check)
+
+def test_snapshots_are_coalesced():
+    def check(exchange, market):
+        snapshots = [market.wait_newer(0, timeout=5)]
+        while len(snapshots) < 6:
+            snapshots.append(market.wait_newer(snapshots[-1].version, timeout=5))
+        assert [s.version for s in snapshots] == list(range(1, 7))
+        # Several exchange batches land between publishes, each published once
+        gaps = np.diff([s.timestamp for s in snapshots])
+        assert gaps.min() >= PUBLISH_SECONDS * 0.9, gaps
+        assert np.diff([s.data['updates'] for s in snapshots]).min() > 100
+    _with_feed(check)
+
+def test_reconnects_after_restart():
+    def check(exchange, market):
+        before = market.wait_newer(0, timeout=5)
+        exchange.stop()
+        _wait_until(lambda: not market.connected)
+        dropped = market.latest()
+        time.sleep(2 * PUBLISH_SECONDS)
+        assert market.latest().version == dropped.version
+        exchange.start()
+        after = market.wait_newer(dropped.version, timeout=5)
+        assert after.version > before.version and market.connected and _two_sided(after)
+    _with_feed(check)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
@@ -0,0 +1,66 @@
+"""Checks of the execution journal's running totals; run with python tests/test_journal.py (or pytest)."""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import closing
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE)]
+
+from intraday_core import journal, limits
+
+NOW = datetime.now()
+
+def _entries():
+    trades = [{'Hour': 'H1', 'Trigger': 'LOB60🔴', 'P&L €k': pnl, 'FENCE': '150MW €47P/€54C collar'} for pnl in (40, 60)]
+    event = limits.LimitEvent(NOW, 'VaR', None, True, 120.0, 100.0, 90.0)
+    return trades + [limits.journal_entry(event._replace(breached=k % 2 == 0)) for k in range(6)]
+
+def _with_journal(check):
+    directory = tempfile.mkdtemp()
+    try:
+        check(os.path.join(directory, 'journal.sqlite'))
+    finally:
+        shutil.rmtree(directory)
+
+def test_avg_pnl_skips_limit_rows():
+    def check(path):
+        log = journal.Journal(path)
+        for entry in _entries():
+            log.append(entry, ts=NOW)
+        log.flush()
+        summary = journal.summarize(log.totals())
+        assert summary['count'] == 8
+        assert summary['avg_pnl'] == 50, summary
+        assert summary['avg_fence'] == 150, summary
+    _with_journal(check)
+
+def test_migrate_backfills_pnl_count():
+    def check(path):
+        # A journal from before pnl_count: old totals table and a trigger that does not maintain it
+        log = journal.Journal(path)
+        with closing(sqlite3.connect(path)) as conn, conn:
+            conn.execute("DROP TRIGGER executions_totals")
+            conn.execute("DROP TABLE execution_totals")
+            conn.execute("CREATE TABLE execution_totals (trading_day TEXT NOT NULL, hour TEXT NOT NULL, trigger TEXT NOT NULL, "
+                         "count INTEGER NOT NULL, pnl_sum REAL NOT NULL, fence_mw_sum REAL NOT NULL, fence_count INTEGER NOT NULL, "
+                         "PRIMARY KEY (trading_day, hour, trigger))")
+        for entry in _entries():
+            log.append(entry, ts=NOW)
+        log.flush()
+        log = journal.Journal(path)
+        assert journal.summarize(log.totals())['avg_pnl'] == 50
+        log.append(_entries()[0], ts=NOW)
+        log.flush()
+        summary = journal.summarize(log.totals())
+        assert summary['count'] == 9 and summary['avg_pnl'] == 140 / 3, summary
+    _with_journal(check)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
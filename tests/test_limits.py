@@ -0,0 +1,38 @@
+"""Checks of limits.LimitEngine; run with python tests/test_limits.py (or pytest)."""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE)]
+
+import numpy as np
+from intraday_core import limits
+
+LABELS = ['H1', 'H2', 'H3']
+
+def _engine():
+    return limits.LimitEngine([limits.Limit('VaR', 100, 90, 2), limits.Limit('Residual', 150, 120, 1, per_period=True)], LABELS)
+
+def test_portfolio_limit_debounce_and_hysteresis():
+    engine = _engine()
+    flips = []
+    for var in [120, 80, 120, 120, 95, 95, 85, 85]:
+        flips.append([event.breached for event in engine.update({'VaR': var, 'Residual': np.zeros(3)}) if event.limit == 'VaR'])
+    # Breach on the second tick in a row above 100; 95 is inside the band; clear on the second tick below 90
+    assert flips == [[], [], [], [True], [], [], [], [False]], flips
+
+def test_per_period_limit_reports_first_breach_and_last_clear():
+    engine = _engine()
+    events = [engine.update({'VaR': 0, 'Residual': np.array(residual)}) for residual in
+              [[200, 0, 0], [200, 200, 0], [100, 200, 200], [100, 100, 100]]]
+    assert [(event.breached, event.period) for event in events[0]] == [(True, 'H1')]
+    # H2 breaching while H1 is in breach, and H1 clearing while H2/H3 are, stay in active()
+    assert events[1] == [] and events[2] == []
+    assert engine.active('Residual').tolist() == [False, False, False]
+    assert [(event.breached, event.period, event.value) for event in events[3]] == [(False, 'H2, H3', 100.0)]
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
@@ -0,0 +1,64 @@
+"""Headless checks of overview.compute_tick; run with python tests/test_overview.py (or pytest)."""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.join(os.path.dirname(HERE), 'benchmarks')]
+
+import numpy as np
+from config import LIMITS
+from intraday_core import blotter, limits, overview, positions, risk, stats
+from fixtures import price_history
+
+SEED = 42
+# Every tick key Overview.render_summary and live_blotter read
+RENDERED_KEYS = {
+    'prices_loaded', 'pnl', 'pos', 'ptf_var', 'imb', 'ptf_vol', 'var_breach', 'imb_breach', 'vol_breach',
+    'market', 'leer', 'ladder', 'iceberg', 'bess', 'wind', 'solar', 'hydro', 'blotter', 'atr',
+}
+
+def _ticks(position_book=None, limit_engine=None, n=5):
+    history = blotter.product_history(price_history(31, seed=SEED))
+    price_stats, model = stats.PriceStats(history), risk.RiskModel(history)
+    rng = np.random.RandomState(SEED)
+    return [overview.compute_tick(price_stats, model, rng=rng, position_book=position_book, limit_engine=limit_engine) for _ in range(n)]
+
+def test_tick_keys_without_book():
+    for tick in _ticks():
+        assert RENDERED_KEYS <= set(tick), RENDERED_KEYS - set(tick)
+
+def test_tick_keys_with_book():
+    book = positions.PositionBook(len(blotter.BLOTTER_COLUMNS), blotter.PRODUCT_HOURS)
+    engine = limits.LimitEngine.from_config(LIMITS, blotter.BLOTTER_LABELS)
+    for tick in _ticks(book, engine):
+        assert RENDERED_KEYS <= set(tick), RENDERED_KEYS - set(tick)
+    assert book.fills > 0
+
+def _hedge_inputs(quarter_mw):
+    # 1 MW long in H1 against quarter_mw in each of its quarters, every other residual flat
+    n = len(blotter.BLOTTER_COLUMNS)
+    position = np.zeros(n, dtype=int)
+    position[0], position[1:5] = 1, quarter_mw
+    return {'ppa_pos': position, 'id_pos': np.zeros(n, dtype=int), 'da_pos': np.zeros(n, dtype=int)}
+
+def test_risk_values_quarter_hours_as_quarter_energy():
+    history = blotter.product_history(price_history(31, seed=SEED))
+    price_stats, model = stats.PriceStats(history), risk.RiskModel(history)
+    period, hours = price_stats.position(blotter.BLOTTER_COLUMNS), blotter.PRODUCT_HOURS[blotter.BLOTTER_COLUMNS]
+    # An hour is the mean of its quarters, so the long hour and short quarters offset exactly
+    hedged_var, _ = overview.portfolio_risk(model, _hedge_inputs(-1), period, hours)
+    assert abs(hedged_var) < 1e-9, hedged_var
+    open_var, _ = overview.portfolio_risk(model, _hedge_inputs(1), period, hours)
+    long_hour, _ = overview.portfolio_risk(model, _hedge_inputs(0), period, hours)
+    assert np.isclose(open_var, 2 * long_hour)
+    # Per row, a quarter-hour MW carries a quarter of the hour's energy risk
+    quarters = blotter.build_blotter({**blotter.draw_tick_inputs(len(period), np.random.RandomState(SEED)), **_hedge_inputs(1)},
+                                     blotter.BLOTTER_LABELS, blotter.BLOTTER_COLUMNS, False, price_stats, model)['Var']
+    expected = model.period_var(np.ones(5), period[:5])[0] * hours[:5] / 1000
+    assert np.allclose(quarters[:5], expected)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
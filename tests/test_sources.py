@@ -0,0 +1,61 @@
+"""Checks of tick recording and replay; run with python tests/test_sources.py (or pytest)."""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE)]
+
+import numpy as np
+from intraday_core import blotter, sources
+
+SEED, TICKS, SPEED = 11, 8, 4.0
+
+def draw(rng):
+    return {**blotter.draw_tick_inputs(len(blotter.BLOTTER_LABELS), rng), 'imb': rng.randint(-10, 10), 'label': 'tick'}
+
+def test_tick_source_is_abstract():
+    try:
+        sources.TickSource()
+        raise AssertionError('TickSource without next() should not instantiate')
+    except TypeError:
+        pass
+
+def test_record_replay_round_trip():
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'ticks.bin')
+        recorder = sources.RecordingSource(path, sources.RandomSource(SEED))
+        recorded = []
+        for _ in range(TICKS):
+            recorded.append(recorder.next('overview', draw))
+            time.sleep(0.02)
+        recorder.close()
+        replay = sources.ReplaySource(path, speed=SPEED, loop=False)
+        assert len(replay) == TICKS
+        fresh = sources.RandomSource(SEED)
+        for expected in recorded:
+            replayed, redrawn = replay.next('overview', draw), fresh.next('overview', draw)
+            assert replayed.keys() == expected.keys()
+            for key, value in expected.items():
+                assert np.array_equal(replayed[key], value) and np.array_equal(redrawn[key], value), key
+                assert np.asarray(replayed[key]).dtype == np.asarray(value).dtype, key
+        try:
+            replay.next('overview', draw)
+            raise AssertionError('a replay without loop should end')
+        except StopIteration:
+            pass
+        # The recorded cadence, sped up
+        times = [timestamp for _, timestamp, _ in sources.read_recording(path)]
+        assert replay.interval('overview', 1.0) == np.median(np.diff(times)) / SPEED
+        assert 0.02 / SPEED <= replay.interval('overview', 1.0) < 0.1 / SPEED
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")
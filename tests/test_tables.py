@@ -0,0 +1,54 @@
+"""Checks of tables.TableRender against Streamlit's Styler marshalling; run with python tests/test_tables.py (or pytest)."""
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.join(os.path.dirname(HERE), 'benchmarks')]
+
+import numpy as np
+from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+from streamlit.proto.ArrowData_pb2 import ArrowData
+from intraday_core import blotter, overview, risk, stats, tables
+from intraday_core.styling import style_dataframe
+from fixtures import price_history
+
+SEED = 42
+
+def _blotter(seed):
+    history = blotter.product_history(price_history(31, seed=SEED))
+    return overview.compute_tick(stats.PriceStats(history), risk.RiskModel(history), rng=np.random.RandomState(seed))['blotter']
+
+def _style(frame):
+    return frame.style.pipe(style_dataframe)
+
+def _marshalled(styler):
+    proto = ArrowData()
+    marshall_styler(proto, styler, 'default')
+    return proto.SerializeToString()
+
+def test_pinned_styler_marshals_like_a_fresh_one():
+    frame = _blotter(1)
+    pinned = tables.pin(_style(frame).set_uuid('t'))
+    expected = _marshalled(_style(frame).set_uuid('t'))
+    assert _marshalled(pinned) == expected
+    assert _marshalled(pinned) == expected
+
+def test_pin_leaves_a_styler_without_the_private_methods_alone():
+    class Styler:
+        pass
+    styler = Styler()
+    assert tables.pin(styler) is styler and not vars(styler)
+
+def test_render_restyles_only_on_a_new_version():
+    render = tables.TableRender('test.blotter')
+    first = render.render(1, _blotter(1), _style)
+    assert render.render(1, _blotter(2), _style) is first
+    second = render.render(2, _blotter(2), _style)
+    assert second is not first and second.uuid == first.uuid == 'test_blotter'
+    assert _marshalled(second) == _marshalled(_style(_blotter(2)).set_uuid('test_blotter'))
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"{name} ok")